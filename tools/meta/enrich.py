@@ -10,14 +10,26 @@ import json
 import yaml
 import httpx
 import logging
+import os
 import sys
 import re
+import threading
+import time
 from typing import List, Dict, Optional
-from datetime import datetime
 from pathlib import Path
 from dataclasses import dataclass, field
 from enum import Enum
 
+try:
+    from yaml import CSafeLoader as YamlLoader  # libyaml-backed parser
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+try:
+    import orjson  # Optional: faster JSON for the metadata cache and LLM responses
+except ImportError:
+    orjson = None
+
 # Logging
 logging.basicConfig(
     level=logging.INFO,  # INFO for normal operation, DEBUG for troubleshooting
@@ -29,6 +41,27 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def json_loads(data):
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj, indent: bool = False) -> bytes:
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Parenthetical suffixes like "(IDF)" are ignored when comparing correspondent names
+_CORE_RE = re.compile(r'\s*\([^)]*\)\s*')
+
+# Leading ```/```json and trailing ``` around an LLM's JSON answer
+_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$')
+
+
 # Data Classes
 class DecisionAction(Enum):
     APPROVE = "approve"
@@ -58,10 +91,43 @@ class Document:
     document_type: Optional[int]
     correspondent: Optional[int]
     original_file_name: str
+    file_extension: str = field(init=False, default="")
+    # Names of the current tags, resolved once via MetadataCache.current_tag_names
+    current_tag_names: Optional[List[str]] = field(init=False, default=None, repr=False)
+    
+    def __post_init__(self):
+        self.file_extension = os.path.splitext(self.original_file_name)[1]
+
+
+def create_paperless_client(base_url: str, headers: Dict[str, str]) -> httpx.AsyncClient:
+    """Long-lived Paperless client - keep-alive pool avoids a TCP/TLS handshake per call"""
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers=headers,
+        timeout=30,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60)
+    )
+
+
+class RateLimiter:
+    """Async limiter that spaces request starts to at most `rate` per second"""
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
     
-    @property
-    def file_extension(self) -> str:
-        return Path(self.original_file_name).suffix
+    async def __aenter__(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    async def __aexit__(self, *exc):
+        return False
 
 
 # Configuration
@@ -74,8 +140,8 @@ class Config:
         logger.info("Configuration loaded")
     
     def _load_yaml(self, path: Path) -> dict:
-        with open(path, 'r') as f:
-            return yaml.safe_load(f)
+        with open(path, 'rb') as f:
+            return yaml.load(f, Loader=YamlLoader)
     
     def _load_prompts(self, prompts_dir: Path) -> dict:
         prompts = {}
@@ -85,38 +151,70 @@ class Config:
 
 # Metadata Cache
 class MetadataCache:
-    def __init__(self, data_dir: Path, paperless_url: str, api_token: str):
+    def __init__(self, data_dir: Path, paperless_url: str, api_token: str, client: Optional[httpx.AsyncClient] = None,
+                 max_stale_hours: float = 24):
         self.data_dir = data_dir
+        # Caches older than this are refreshed before use instead of in the background
+        self.max_stale_hours = max_stale_hours
         self.paperless_url = paperless_url
         clean_token = api_token.strip().strip('"').strip("'")
         self.headers = {"Authorization": f"Token {clean_token}"}
+        # Reuse the PaperlessService connection pool when one is handed in
+        self._owns_client = client is None
+        self._client = client or create_paperless_client(paperless_url, self.headers)
         
         self.tags: List[Dict] = []
         self.types: List[Dict] = []
         self.correspondents: List[Dict] = []
         self.tags_by_id: Dict[int, Dict] = {}
         self.tags_by_name: Dict[str, Dict] = {}
+        self.types_by_name: Dict[str, Dict] = {}
+        self.correspondents_lower: List[tuple] = []  # (name_lower, name_core, id)
+        self.correspondents_exact: Dict[str, int] = {}
+        self.correspondents_core: Dict[str, int] = {}
+        # Comma-joined names for the LLM prompt, rebuilt with the lookups
+        self.tags_joined = ""
+        self.types_joined = ""
+        self.correspondents_joined = ""
+        # ETag per collection of the data currently loaded, for conditional refreshes
+        self.etags: Dict[str, Optional[str]] = {}
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+    
+    async def _fetch_list(self, key: str, path: str) -> Optional[httpx.Response]:
+        """GET a metadata list; returns None if Paperless reports it unchanged (304)"""
+        headers = {}
+        if self.etags.get(key):
+            headers["If-None-Match"] = self.etags[key]
+        r = await self._client.get(path, headers=headers)
+        if r.status_code == 304:
+            return None
+        r.raise_for_status()
+        return r
     
     async def load_from_paperless(self):
         logger.info("Loading metadata from Paperless...")
-        async with httpx.AsyncClient(timeout=30) as client:
-            # Tags
-            r = await client.get(f"{self.paperless_url}/api/tags/?page_size=1000", headers=self.headers)
-            r.raise_for_status()
-            self.tags = r.json()["results"]
-            
-            # Types
-            r = await client.get(f"{self.paperless_url}/api/document_types/?page_size=1000", headers=self.headers)
-            r.raise_for_status()
-            self.types = r.json()["results"]
+        # Tags, types and correspondents are independent - fetch them concurrently
+        tags_r, types_r, corr_r = await asyncio.gather(
+            self._fetch_list("tags", "/api/tags/?page_size=1000"),
+            self._fetch_list("types", "/api/document_types/?page_size=1000"),
+            self._fetch_list("correspondents", "/api/correspondents/?page_size=1000")
+        )
+
+        async with self._lock:
+            # Unchanged collections (304) keep the entries already loaded from cache
+            if tags_r is not None:
+                self.tags = json_loads(tags_r.content)["results"]
+                self.etags["tags"] = tags_r.headers.get("ETag")
+            if types_r is not None:
+                self.types = json_loads(types_r.content)["results"]
+                self.etags["types"] = types_r.headers.get("ETag")
+            if corr_r is not None:
+                self.correspondents = json_loads(corr_r.content)["results"]
+                self.etags["correspondents"] = corr_r.headers.get("ETag")
             
-            # Correspondents
-            r = await client.get(f"{self.paperless_url}/api/correspondents/?page_size=1000", headers=self.headers)
-            r.raise_for_status()
-            self.correspondents = r.json()["results"]
-        
-        self._build_lookups()
-        await self.save_to_cache()
+            self._build_lookups()
+            await self.save_to_cache()
         logger.info(f"Loaded {len(self.tags)} tags, {len(self.types)} types, {len(self.correspondents)} correspondents")
     
     async def load_from_cache(self):
@@ -128,76 +226,156 @@ class MetadataCache:
             await self.load_from_paperless()
             return
         
-        # Check if cache is stale (older than 1 hour)
-        if self._is_cache_stale(cache_file):
-            logger.info("Cache is stale (>1 hour old), refreshing from Paperless...")
+        # Read and parse the cache once; staleness and age are derived from the same dict
+        try:
+            data = json_loads(cache_file.read_bytes())
+        except (json.JSONDecodeError, OSError):
+            data = None
+        
+        # Too old (or unreadable) to be worth serving - block on a refresh
+        if data is None or self._is_cache_stale(data, self.max_stale_hours):
+            logger.info(f"Cache is missing data or older than {self.max_stale_hours}h, refreshing from Paperless...")
             await self.load_from_paperless()
             return
         
         # Load from cache
-        with open(cache_file, 'r') as f:
-            data = json.load(f)
-            self.tags = data["tags"]
-            self.types = data["types"]
-            self.correspondents = data["correspondents"]
+        self.tags = data["tags"]
+        self.types = data["types"]
+        self.correspondents = data["correspondents"]
+        self.etags = data.get("etags") or {}
         self._build_lookups()
         
-        cache_age = self._get_cache_age(cache_file)
+        cache_age = self._get_cache_age(data)
         logger.info(f"Metadata loaded from cache (age: {cache_age})")
+        
+        # Stale but usable (older than 1 hour): serve it and refresh in the background
+        if self._is_cache_stale(data) and self._refresh_task is None:
+            logger.info("Cache is stale (>1 hour old), refreshing from Paperless in the background...")
+            self._refresh_task = asyncio.create_task(self._refresh_in_background())
     
-    def _is_cache_stale(self, cache_file: Path, max_age_hours: int = 1) -> bool:
+    async def _refresh_in_background(self):
+        try:
+            await self.load_from_paperless()
+        except Exception as e:
+            logger.warning(f"Background metadata refresh failed, keeping cached data: {e}")
+    
+    def _is_cache_stale(self, data: dict, max_age_hours: int = 1) -> bool:
         """Check if cache is older than max_age_hours"""
         try:
-            with open(cache_file, 'r') as f:
-                data = json.load(f)
-                updated = data.get("updated")
-                
-                if not updated:
-                    # Old cache without timestamp
-                    return True
-                
-                updated_dt = datetime.fromisoformat(updated)
-                age = datetime.now() - updated_dt
-                return age.total_seconds() > (max_age_hours * 3600)
-        except (json.JSONDecodeError, KeyError, ValueError):
+            updated = data.get("updated")
+            
+            if not updated:
+                # Old cache without timestamp
+                return True
+            
+            if not all(key in data for key in ("tags", "types", "correspondents")):
+                # Corrupted cache
+                return True
+            
+            # Unix seconds; older caches stored an ISO string and fail here as stale
+            age = time.time() - updated
+            return age > (max_age_hours * 3600)
+        except (KeyError, ValueError, TypeError, AttributeError):
             # Corrupted cache
             return True
     
-    def _get_cache_age(self, cache_file: Path) -> str:
+    def _get_cache_age(self, data: dict) -> str:
         """Get human-readable cache age"""
         try:
-            with open(cache_file, 'r') as f:
-                data = json.load(f)
-                updated = data.get("updated")
-                
-                if not updated:
-                    return "unknown"
-                
-                updated_dt = datetime.fromisoformat(updated)
-                age = datetime.now() - updated_dt
-                
-                if age.total_seconds() < 60:
-                    return f"{int(age.total_seconds())}s"
-                elif age.total_seconds() < 3600:
-                    return f"{int(age.total_seconds() / 60)}m"
-                else:
-                    return f"{age.total_seconds() / 3600:.1f}h"
+            updated = data.get("updated")
+            
+            if not updated:
+                return "unknown"
+            
+            age = time.time() - updated
+            
+            if age < 60:
+                return f"{int(age)}s"
+            elif age < 3600:
+                return f"{int(age / 60)}m"
+            else:
+                return f"{age / 3600:.1f}h"
         except:
             return "unknown"
     
     def _build_lookups(self):
         self.tags_by_id = {tag["id"]: tag for tag in self.tags}
         self.tags_by_name = {tag["name"].lower(): tag for tag in self.tags}
+        self.types_by_name = {}
+        for t in self.types:
+            # First entry wins, like the linear scans this replaces
+            self.types_by_name.setdefault(t["name"].lower(), t)
+        self.tags_joined = ", ".join(t["name"] for t in self.tags)
+        self.types_joined = ", ".join(t["name"] for t in self.types)
+        self._build_correspondent_lookups()
+    
+    def _build_correspondent_lookups(self):
+        """Normalize correspondent names once so matching is a dict hit instead of repeated scans"""
+        self.correspondents_lower = []
+        self.correspondents_exact = {}
+        self.correspondents_core = {}
+        for c in self.correspondents:
+            self._index_correspondent(c)
+        self.correspondents_joined = ", ".join(c["name"] for c in self.correspondents)
+    
+    def _index_correspondent(self, c: Dict):
+        name_lower = c["name"].lower()
+        name_core = _CORE_RE.sub('', name_lower).strip()
+        self.correspondents_lower.append((name_lower, name_core, c["id"]))
+        # setdefault keeps the first entry, matching the previous first-hit scan order
+        self.correspondents_exact.setdefault(name_lower, c["id"])
+        if name_core:
+            self.correspondents_core.setdefault(name_core, c["id"])
+    
+    # Newly created entries update the lookups in place instead of rebuilding them
+    def add_tag(self, tag: Dict):
+        self.tags.append(tag)
+        self.tags_by_id[tag["id"]] = tag
+        self.tags_by_name[tag["name"].lower()] = tag
+        self.tags_joined = f"{self.tags_joined}, {tag['name']}" if self.tags_joined else tag["name"]
+    
+    def add_type(self, doc_type: Dict):
+        self.types.append(doc_type)
+        self.types_by_name.setdefault(doc_type["name"].lower(), doc_type)
+        self.types_joined = f"{self.types_joined}, {doc_type['name']}" if self.types_joined else doc_type["name"]
+    
+    def add_correspondent(self, correspondent: Dict):
+        self.correspondents.append(correspondent)
+        self._index_correspondent(correspondent)
+        name = correspondent["name"]
+        self.correspondents_joined = f"{self.correspondents_joined}, {name}" if self.correspondents_joined else name
     
     async def save_to_cache(self):
         cache_file = self.data_dir / "metadata_cache.json"
-        with open(cache_file, 'w') as f:
-            json.dump({
-                "tags": self.tags,
-                "types": self.types,
-                "correspondents": self.correspondents,
-                "updated": datetime.now().isoformat()
-            }, f, indent=2)
+        cache_file.write_bytes(json_dumps({
+            "tags": self.tags,
+            "types": self.types,
+            "correspondents": self.correspondents,
+            "etags": self.etags,
+            "updated": int(time.time())
+        }, indent=True))
+    
+    def current_tag_names(self, document: Document) -> List[str]:
+        if document.current_tag_names is None:
+            document.current_tag_names = [self.tags_by_id[tid]["name"] for tid in document.tags if tid in self.tags_by_id]
+        return document.current_tag_names
+    
+    async def wait_for_refresh(self):
+        """Wait for a background refresh; it replaces the lists, so creations must come after it"""
+        if self._refresh_task is not None:
+            await asyncio.shield(self._refresh_task)
+    
+    async def aclose(self):
+        # Let a running refresh finish so the cache file gets updated
+        await self.wait_for_refresh()
+        if self._owns_client:
+            await self._client.aclose()
+    
+    def find_type_by_name(self, name: str) -> Optional[Dict]:
+        return self.types_by_name.get(name.lower())
+    
+    def find_tag_by_name(self, name: str) -> Optional[Dict]:
+        return self.tags_by_name.get(name.lower())
     
     def get_tag_ids(self, tag_names: List[str]) -> List[int]:
         ids = []
@@ -210,40 +388,78 @@ class MetadataCache:
 
 # Rules Engine
 class RulesEngine:
+    TRIGGERS = ("filename", "content")
+    
     def __init__(self, rules: dict):
         self.rules = rules
+        # Compile condition patterns once instead of per document
+        self._compiled_rules = []
+        for rule in self.rules.get("auto_rules", []):
+            patterns = [
+                re.compile(cond["pattern"], re.IGNORECASE if cond.get("case_insensitive", True) else 0)
+                for cond in rule.get("conditions", [])
+                if cond.get("pattern")
+            ]
+            self._compiled_rules.append((rule, patterns))
+        
+        self._rules_by_trigger = {
+            trigger: [idx for idx, (rule, _) in enumerate(self._compiled_rules) if rule.get("trigger") == trigger]
+            for trigger in self.TRIGGERS
+        }
+        self._group_rule: Dict[str, int] = {}
+        self._fused = {trigger: self._fuse(trigger) for trigger in self.TRIGGERS}
+    
+    def _fuse(self, trigger: str) -> Optional[re.Pattern]:
+        """Combine all patterns of a trigger into one alternation so a target is scanned once"""
+        parts = []
+        for idx in self._rules_by_trigger[trigger]:
+            for n, pattern in enumerate(self._compiled_rules[idx][1]):
+                if pattern.groups:
+                    # User groups/backreferences can't be renumbered safely - scan rule by rule
+                    return None
+                name = f"r{idx}_{n}"
+                flag = "i" if pattern.flags & re.IGNORECASE else "-i"
+                parts.append(f"(?P<{name}>(?{flag}:{pattern.pattern}))")
+                self._group_rule[name] = idx
+        if not parts:
+            return None
+        try:
+            return re.compile("|".join(parts))
+        except re.error:
+            return None
+    
+    def _matched_rules(self, trigger: str, target: str) -> set:
+        candidates = self._rules_by_trigger[trigger]
+        fused = self._fused[trigger]
+        matched = set()
+        if fused is not None:
+            matched = {self._group_rule[m.lastgroup] for m in fused.finditer(target)}
+            if not matched:
+                # No alternative matched anywhere, so no single rule can match either
+                return matched
+            # A match can overlap and hide another rule's match - re-check only those
+            candidates = [idx for idx in candidates if idx not in matched]
+        for idx in candidates:
+            if any(pattern.search(target) for pattern in self._compiled_rules[idx][1]):
+                matched.add(idx)
+        return matched
     
     def apply_auto_rules(self, document: Document) -> Dict:
         suggestions = {"tags": [], "document_type": None, "confidence_boost": 0.0}
         
-        for rule in self.rules.get("auto_rules", []):
-            trigger = rule.get("trigger")
-            conditions = rule.get("conditions", [])
+        matched = self._matched_rules("filename", document.original_file_name)
+        matched |= self._matched_rules("content", document.content[:2000])
+        
+        for idx, (rule, _) in enumerate(self._compiled_rules):
+            if idx not in matched:
+                continue
             actions = rule.get("actions", {})
-            matched = False
-            
-            if trigger == "filename":
-                for cond in conditions:
-                    pattern = cond.get("pattern")
-                    flags = re.IGNORECASE if cond.get("case_insensitive", True) else 0
-                    if re.search(pattern, document.original_file_name, flags):
-                        matched = True
-                        break
-            elif trigger == "content":
-                for cond in conditions:
-                    pattern = cond.get("pattern")
-                    flags = re.IGNORECASE if cond.get("case_insensitive", True) else 0
-                    if re.search(pattern, document.content[:2000], flags):
-                        matched = True
-                        break
-            
-            if matched:
-                if "add_tags" in actions:
-                    suggestions["tags"].extend(actions["add_tags"])
-                if "set_type" in actions and not suggestions["document_type"]:
-                    suggestions["document_type"] = actions["set_type"]
-                if "confidence_boost" in actions:
-                    suggestions["confidence_boost"] += actions["confidence_boost"]
+            if "add_tags" in actions:
+                suggestions["tags"].extend(actions["add_tags"])
+            if "set_type" in actions and not suggestions["document_type"]:
+                suggestions["document_type"] = actions["set_type"]
+            if "confidence_boost" in actions:
+                suggestions["confidence_boost"] += actions["confidence_boost"]
         
         suggestions["tags"] = list(set(suggestions["tags"]))
         return suggestions
@@ -254,11 +470,15 @@ class LLMService:
     def __init__(self, config: dict, prompts: dict, examples_dir: Path):
         self.base_url = config["base_url"]
         self.model = config.get("model")  # Optional - auto-detected
+        self.preferred_model = config.get("preferred_model")  # Wins over `model` when loaded
         self.temperature = config["temperature"]
         self.max_tokens = config["max_tokens"]
         self.timeout = config.get("timeout", 180)
         self.prompts = prompts
         self.examples_dir = examples_dir
+        self._examples_cache: Optional[tuple] = None  # (mtime key, rendered examples)
+        # LM Studio serializes generation on the model - keep in-flight requests small
+        self._sem = asyncio.Semaphore(config.get("max_concurrency", 4))
     
     async def check_connection_and_select_model(self, interactive: bool = True) -> bool:
         """Check LM Studio and auto-select model"""
@@ -267,13 +487,19 @@ class LLMService:
                 response = await client.get(f"{self.base_url}/v1/models")
                 response.raise_for_status()
                 
-                available_models = [m["id"] for m in response.json().get("data", [])]
+                available_models = [m["id"] for m in json_loads(response.content).get("data", [])]
                 
                 if not available_models:
                     print("\n❌ No models loaded in LM Studio!")
                     print("   Please load a model and try again.")
                     return False
                 
+                # Preferred (small, quantized) model - use whenever it is loaded
+                if self.preferred_model and self.preferred_model in available_models:
+                    self.model = self.preferred_model
+                    print(f"\n✅ Using preferred model: {self.model}")
+                    return True
+                
                 # Single model - use automatically
                 if len(available_models) == 1:
                     self.model = available_models[0]
@@ -318,28 +544,121 @@ class LLMService:
             print(f"\n❌ Error: {e}")
             return False
     
+    async def warmup(self):
+        """One-token completion so the model is loaded before the first document"""
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await client.post(
+                    f"{self.base_url}/v1/chat/completions",
+                    json={
+                        "model": self.model,
+                        "messages": [{"role": "user", "content": "Hi"}],
+                        "max_tokens": 1
+                    }
+                )
+                response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning(f"Model warmup failed: {e}")
+    
     async def analyze_document(self, document: Document, metadata: MetadataCache) -> EnrichmentSuggestion:
         prompt = self._build_prompt(document, metadata)
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(
-                f"{self.base_url}/v1/chat/completions",
-                json={
-                    "model": self.model,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "temperature": self.temperature,
-                    "max_tokens": self.max_tokens
-                }
-            )
-            response.raise_for_status()
-            result = response.json()["choices"][0]["message"]["content"]
+        async with self._sem, httpx.AsyncClient(timeout=self.timeout) as client:
+            result = await self._stream_completion(client, {
+                "model": self.model,
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": self.temperature,
+                "max_tokens": self.max_tokens,
+                "stream": True
+            })
         
         return self._parse_response(result)
     
+    async def _stream_completion(self, client: httpx.AsyncClient, payload: dict) -> str:
+        """Collect streamed content, hanging up once a complete result object has arrived"""
+        # Runaway generations are cut off well past what max_tokens should produce
+        max_chars = self.max_tokens * 16
+        text = ""
+        pos = depth = 0
+        start = -1
+        in_string = escaped = False
+        # Marker searches resume where the last one stopped, backed up far enough
+        # to catch a marker split across two deltas
+        think_from = 0
+        think_open = think_closed = False
+        
+        async with client.stream(
+            "POST",
+            f"{self.base_url}/v1/chat/completions",
+            content=json_dumps(payload),
+            headers={"Content-Type": "application/json"}
+        ) as response:
+            response.raise_for_status()
+            if not response.headers.get("content-type", "").startswith("text/event-stream"):
+                # Server ignored stream=true and sent a regular completion
+                await response.aread()
+                return json_loads(response.content)["choices"][0]["message"]["content"]
+            
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                choices = json_loads(data).get("choices") or [{}]
+                delta = (choices[0].get("delta") or {}).get("content")
+                if not delta:
+                    continue
+                text += delta
+                if len(text) > max_chars:
+                    raise ValueError(f"LLM response exceeded {max_chars} chars")
+                
+                # Braces inside an open [THINK] block are reasoning, not the answer
+                if not think_closed:
+                    if not think_open:
+                        think_start = text.find("[THINK]", think_from)
+                        if think_start == -1:
+                            think_from = max(think_from, len(text) - 6)
+                        else:
+                            think_open = True
+                            think_from = think_start + 7
+                    if think_open:
+                        think_end = text.find("[/THINK]", think_from)
+                        if think_end == -1:
+                            think_from = max(think_from, len(text) - 7)
+                            continue
+                        think_closed = True
+                        pos = max(pos, think_end + 8)
+                
+                # Track brace depth outside JSON strings, one new character at a time
+                while pos < len(text):
+                    ch = text[pos]
+                    if in_string:
+                        if escaped:
+                            escaped = False
+                        elif ch == "\\":
+                            escaped = True
+                        elif ch == '"':
+                            in_string = False
+                    elif ch == '"':
+                        in_string = depth > 0
+                    elif ch == "{":
+                        if depth == 0:
+                            start = pos
+                        depth += 1
+                    elif ch == "}" and depth > 0:
+                        depth -= 1
+                        if depth == 0 and '"optimized_title"' in text[start:pos]:
+                            logger.debug("Complete JSON received after %d chars, closing stream", pos + 1)
+                            return text
+                    pos += 1
+        
+        return text
+    
     def _build_prompt(self, document: Document, metadata: MetadataCache) -> str:
         template = self.prompts.get("analyze_document", "")
         
-        current_tags = [metadata.tags_by_id[tid]["name"] for tid in document.tags if tid in metadata.tags_by_id]
+        current_tags = metadata.current_tag_names(document)
         
         return template.format(
             title=document.title,
@@ -350,19 +669,26 @@ class LLMService:
             current_type="None",
             current_correspondent="None",
             content=document.content[:2000],
-            available_tags=", ".join([t["name"] for t in metadata.tags]),
-            available_types=", ".join([t["name"] for t in metadata.types]),
-            available_correspondents=", ".join([c["name"] for c in metadata.correspondents]),
-            examples=self._load_examples()
+            available_tags=metadata.tags_joined,
+            available_types=metadata.types_joined,
+            available_correspondents=metadata.correspondents_joined,
+            examples=self._get_examples()
         )
     
-    def _load_examples(self) -> str:
+    def _get_examples(self) -> str:
+        """Rendered examples, reloaded only when an example file changes"""
+        files = sorted(self.examples_dir.glob("*.json"))
+        key = tuple((f.name, f.stat().st_mtime_ns) for f in files)
+        if self._examples_cache is None or self._examples_cache[0] != key:
+            self._examples_cache = (key, self._load_examples(files))
+        return self._examples_cache[1]
+    
+    def _load_examples(self, files: List[Path]) -> str:
         examples = ""
-        for f in self.examples_dir.glob("*.json"):
-            with open(f, 'r') as file:
-                data = json.load(file)
-                for ex in data.get("examples", [])[:1]:
-                    examples += f"\n{json.dumps(ex, indent=2)}\n"
+        for f in files:
+            data = json_loads(f.read_bytes())
+            for ex in data.get("examples", [])[:1]:
+                examples += f"\n{json_dumps(ex, indent=True).decode()}\n"
         return examples if examples else "No examples"
     
     def _parse_response(self, response: str) -> EnrichmentSuggestion:
@@ -374,46 +700,36 @@ class LLMService:
         
         logger.debug(f"After removing [THINK] blocks: {len(cleaned)} chars")
         
-        # Look for JSON object with proper nesting (handles nested objects)
-        # Find the outermost {...} that contains "optimized_title"
+        # Find the first complete JSON object that carries "optimized_title".
+        # raw_decode scans in C and stops at the object's end, so surrounding prose,
+        # code fences or braces in reasoning text don't need a Python-level scan.
+        data = None
         if '"optimized_title"' in cleaned:
-            # Find all potential JSON blocks
-            brace_count = 0
-            start_idx = -1
-            
-            for i, char in enumerate(cleaned):
-                if char == '{':
-                    if brace_count == 0:
-                        start_idx = i
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0 and start_idx != -1:
-                        # Found a complete JSON block
-                        json_str = cleaned[start_idx:i+1]
-                        if '"optimized_title"' in json_str:
-                            cleaned = json_str
-                            logger.debug("Extracted JSON from response using brace matching")
-                            break
-        
-        # Remove markdown code blocks if present
-        if cleaned.startswith("```json"):
-            cleaned = cleaned[7:]
-        if cleaned.startswith("```"):
-            cleaned = cleaned[3:]
-        if cleaned.endswith("```"):
-            cleaned = cleaned[:-3]
-        cleaned = cleaned.strip()
+            idx = cleaned.find('{')
+            while idx != -1:
+                try:
+                    obj, _ = _JSON_DECODER.raw_decode(cleaned, idx)
+                    if isinstance(obj, dict) and "optimized_title" in obj:
+                        data = obj
+                        logger.debug("Extracted JSON object at offset %d", idx)
+                        break
+                except json.JSONDecodeError:
+                    pass
+                idx = cleaned.find('{', idx + 1)
         
-        try:
-            data = json.loads(cleaned)
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON response")
-            logger.error(f"Full response length: {len(response)} chars")
-            logger.error(f"First 300 chars: {response[:300]}")
-            logger.error(f"Last 300 chars: {response[-300:]}")
-            logger.error(f"Cleaned attempt (first 500): {cleaned[:500]}")
-            raise ValueError(f"LLM returned invalid JSON. Model may need different prompt format.")
+        if data is None:
+            # Remove markdown code blocks if present
+            cleaned = _FENCE_RE.sub('', cleaned).strip()
+            
+            try:
+                data = json_loads(cleaned)
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse JSON response")
+                logger.error(f"Full response length: {len(response)} chars")
+                logger.error(f"First 300 chars: {response[:300]}")
+                logger.error(f"Last 300 chars: {response[-300:]}")
+                logger.error(f"Cleaned attempt (first 500): {cleaned[:500]}")
+                raise ValueError(f"LLM returned invalid JSON. Model may need different prompt format.")
         # Handle new_correspondent - LLM sometimes returns dict instead of string
         new_correspondent = data.get("new_correspondent")
         if isinstance(new_correspondent, dict):
@@ -447,71 +763,84 @@ class LLMService:
 
 # Paperless Service
 class PaperlessService:
-    def __init__(self, base_url: str, api_token: str):
+    def __init__(self, base_url: str, api_token: str, max_concurrency: int = 32, requests_per_second: float = 20):
         self.base_url = base_url
         clean_token = api_token.strip().strip('"').strip("'")
         self.headers = {"Authorization": f"Token {clean_token}"}
+        self.client = create_paperless_client(base_url, self.headers)
+        # Bound fan-out so concurrent fetches don't swamp Paperless into 429s
+        self._sem = asyncio.Semaphore(max_concurrency)
+        self._limiter = RateLimiter(requests_per_second)
+    
+    async def aclose(self):
+        await self.client.aclose()
+    
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        async with self._limiter, self._sem:
+            return await self.client.request(method, path, **kwargs)
     
     async def get_documents_with_tag(self, tag_id: int) -> List[Document]:
-        documents = []
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.get(
-                f"{self.base_url}/api/documents/?tags__id__in={tag_id}&page_size=100",
-                headers=self.headers
+        page_size = 100
+
+        async def _fetch_page(page: int) -> dict:
+            r = await self._request("GET", f"/api/documents/?tags__id__in={tag_id}&page_size={page_size}&page={page}&full_perms=false")
+            r.raise_for_status()
+            return json_loads(r.content)
+
+        async def _fetch(doc_id: int) -> dict:
+            r = await self._request("GET", f"/api/documents/{doc_id}/")
+            r.raise_for_status()
+            return json_loads(r.content)
+
+        # First page reveals the total count, remaining pages are fetched concurrently
+        first = await _fetch_page(1)
+        results = first["results"]
+        n_pages = -(-first.get("count", 0) // page_size)
+        if n_pages > 1:
+            pages = await asyncio.gather(*[_fetch_page(p) for p in range(2, n_pages + 1)])
+            for page in pages:
+                results.extend(page["results"])
+
+        # The list endpoint already returns content - only re-GET records that lack it
+        missing = [d["id"] for d in results if "content" not in d]
+        fetched = {}
+        if missing:
+            fetched = {doc["id"]: doc for doc in await asyncio.gather(*[_fetch(doc_id) for doc_id in missing])}
+        full_docs = [fetched.get(d["id"], d) for d in results]
+
+        return [
+            Document(
+                id=full_doc["id"],
+                title=full_doc["title"],
+                content=full_doc.get("content", ""),
+                created=full_doc["created"],
+                tags=full_doc.get("tags", []),
+                document_type=full_doc.get("document_type"),
+                correspondent=full_doc.get("correspondent"),
+                original_file_name=full_doc.get("original_file_name", "")
             )
-            results = r.json()["results"]
-            
-            for doc_data in results:
-                r = await client.get(f"{self.base_url}/api/documents/{doc_data['id']}/", headers=self.headers)
-                full_doc = r.json()
-                documents.append(Document(
-                    id=full_doc["id"],
-                    title=full_doc["title"],
-                    content=full_doc.get("content", ""),
-                    created=full_doc["created"],
-                    tags=full_doc.get("tags", []),
-                    document_type=full_doc.get("document_type"),
-                    correspondent=full_doc.get("correspondent"),
-                    original_file_name=full_doc.get("original_file_name", "")
-                ))
-        return documents
+            for full_doc in full_docs
+        ]
     
     async def update_document(self, doc_id: int, **kwargs) -> bool:
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.patch(
-                f"{self.base_url}/api/documents/{doc_id}/",
-                headers=self.headers,
-                json=kwargs
-            )
-            r.raise_for_status()
-            return True
+        r = await self._request("PATCH", f"/api/documents/{doc_id}/", json=kwargs)
+        r.raise_for_status()
+        return True
     
     async def create_correspondent(self, name: str) -> int:
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.post(
-                f"{self.base_url}/api/correspondents/",
-                headers=self.headers,
-                json={"name": name}
-            )
-            return r.json()["id"]
+        r = await self._request("POST", "/api/correspondents/", json={"name": name})
+        r.raise_for_status()
+        return json_loads(r.content)["id"]
     
     async def create_document_type(self, name: str) -> int:
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.post(
-                f"{self.base_url}/api/document_types/",
-                headers=self.headers,
-                json={"name": name}
-            )
-            return r.json()["id"]
+        r = await self._request("POST", "/api/document_types/", json={"name": name})
+        r.raise_for_status()
+        return json_loads(r.content)["id"]
     
     async def create_tag(self, name: str) -> int:
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.post(
-                f"{self.base_url}/api/tags/",
-                headers=self.headers,
-                json={"name": name, "color": "#3B82F6"}
-            )
-            return r.json()["id"]
+        r = await self._request("POST", "/api/tags/", json={"name": name, "color": "#3B82F6"})
+        r.raise_for_status()
+        return json_loads(r.content)["id"]
 
 
 # Enrichment Service
@@ -523,6 +852,10 @@ class EnrichmentService:
         self.rules = rules
         self.paperless = paperless
         self.settings = settings
+        # In-flight creations keyed by (kind, lowercased name), shared by concurrent documents
+        self._pending: Dict[tuple, asyncio.Future] = {}
+        # Cap concurrent tag creations so a heavily tagged document doesn't burst Paperless
+        self._tag_create_sem = asyncio.Semaphore(8)
     
     async def enrich_document(self, document: Document) -> EnrichmentSuggestion:
         logger.info(f"Enriching: {document.title} (ID: {document.id})")
@@ -549,144 +882,182 @@ class EnrichmentService:
             confidence=confidence,
             reasoning=llm_suggestion.reasoning
         )
+
+    async def _create_once(self, kind: str, name: str, create) -> int:
+        """Run `create()` once per (kind, name); concurrent callers share the same request"""
+        key = (kind, name.lower())
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.ensure_future(create())
+            self._pending[key] = future
+            future.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(future)
+    
+    async def _resolve_correspondent(self, suggestion: EnrichmentSuggestion) -> Optional[int]:
+        """Handle correspondent with intelligent fuzzy matching"""
+        if suggestion.new_correspondent:
+            logger.debug(">>> ENTERING new_correspondent branch: %r", suggestion.new_correspondent)
+            # Look up against refreshed data so an existing name is not created twice
+            await self.metadata.wait_for_refresh()
+            # CRITICAL: Check if correspondent already exists before creating new one
+            # This handles cases where LLM suggests "Org (Abbr)" but "Org" already exists
+            existing_id = self._find_correspondent(suggestion.new_correspondent)
+            logger.debug(">>> _find_correspondent returned: %s", existing_id)
+            if existing_id:
+                logger.info("✓ new_correspondent %r matched existing ID %s via fuzzy matching", suggestion.new_correspondent, existing_id)
+                return existing_id
+            
+            name = suggestion.new_correspondent
+            
+            async def create() -> int:
+                # Truly new correspondent - create it
+                logger.info("✗ No match found, creating new correspondent: %r", name)
+                correspondent_id = await self.paperless.create_correspondent(name)
+                self.metadata.add_correspondent({"id": correspondent_id, "name": name})
+                logger.info("Created new correspondent: %s (ID: %s)", name, correspondent_id)
+                return correspondent_id
+            
+            return await self._create_once("correspondent", name, create)
+        elif suggestion.correspondent:
+            logger.debug(">>> ENTERING correspondent branch: %r", suggestion.correspondent)
+            correspondent_id = self._find_correspondent(suggestion.correspondent)
+            logger.debug(">>> _find_correspondent returned: %s", correspondent_id)
+            return correspondent_id
+        return None
+    
+    async def _resolve_document_type(self, suggestion: EnrichmentSuggestion) -> Optional[int]:
+        """Handle document type with case-insensitive matching"""
+        if suggestion.new_document_type:
+            await self.metadata.wait_for_refresh()
+            # Check if type already exists (case-insensitive)
+            doc_type = self.metadata.find_type_by_name(suggestion.new_document_type)
+            if doc_type:
+                logger.info("new_document_type %r matched existing type %r (ID: %s)", suggestion.new_document_type, doc_type["name"], doc_type["id"])
+                return doc_type["id"]
+            
+            name = suggestion.new_document_type
+            
+            async def create() -> int:
+                # Truly new type - create it
+                type_id = await self.paperless.create_document_type(name)
+                self.metadata.add_type({"id": type_id, "name": name})
+                logger.info("Created new document type: %s (ID: %s)", name, type_id)
+                return type_id
+            
+            return await self._create_once("document_type", name, create)
+        elif suggestion.document_type:
+            doc_type = self.metadata.find_type_by_name(suggestion.document_type)
+            if doc_type:
+                return doc_type["id"]
+        return None
+    
+    async def _resolve_new_tag(self, new_tag: str) -> str:
+        """Return the name to use for a suggested new tag, creating it if needed"""
+        await self.metadata.wait_for_refresh()
+        # Check if tag already exists (case-insensitive)
+        existing_tag = self.metadata.find_tag_by_name(new_tag)
+        if existing_tag:
+            logger.info("new_tag %r already exists as %r (ID: %s) - skipping creation", new_tag, existing_tag["name"], existing_tag["id"])
+            return existing_tag["name"]  # Use existing name
+        
+        async def create() -> int:
+            # Truly new tag - create it
+            async with self._tag_create_sem:
+                tag_id = await self.paperless.create_tag(new_tag)
+            self.metadata.add_tag({"id": tag_id, "name": new_tag})
+            logger.info("Created new tag: %s (ID: %s)", new_tag, tag_id)
+            return tag_id
+        
+        await self._create_once("tag", new_tag, create)
+        return new_tag
     
     def _find_correspondent(self, name: str) -> Optional[int]:
         """Find correspondent ID with intelligent fuzzy matching"""
-        logger.info(f"_find_correspondent called with: '{name}'")
+        logger.debug("_find_correspondent called with: %r", name)
         
         if not name:
-            logger.info("_find_correspondent: name is empty, returning None")
+            logger.debug("_find_correspondent: name is empty, returning None")
             return None
         
         name_lower = name.lower()
-        logger.info(f"_find_correspondent: searching for '{name_lower}'")
-        logger.info(f"_find_correspondent: available correspondents: {[c['name'] for c in self.metadata.correspondents]}")
+        logger.debug("_find_correspondent: searching for %r", name_lower)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("_find_correspondent: available correspondents: %s", [c["name"] for c in self.metadata.correspondents])
         
         # Try exact match first
-        for c in self.metadata.correspondents:
-            if c["name"].lower() == name_lower:
-                logger.info(f"_find_correspondent: EXACT MATCH found - '{c['name']}' (ID: {c['id']})")
-                return c["id"]
-        
-        logger.info("_find_correspondent: No exact match, trying bidirectional prefix matching...")
-        
-        # Try bidirectional prefix match
-        # Case A: "Sheri (Author)" matches "Sheri (Author), UX Collective"
-        # Case B: "Interaction Design Foundation (IDF)" matches "Interaction Design Foundation"
-        for c in self.metadata.correspondents:
-            existing_lower = c["name"].lower()
-            
-            # Suggested is prefix of existing
-            if existing_lower.startswith(name_lower):
-                logger.info(f"_find_correspondent: PREFIX MATCH (suggested is prefix) - '{name}' → '{c['name']}' (ID: {c['id']})")
-                return c["id"]
-            
-            # Existing is prefix of suggested (NEW: handles abbreviations case)
-            if name_lower.startswith(existing_lower):
-                logger.info(f"_find_correspondent: PREFIX MATCH (existing is prefix) - '{name}' → '{c['name']}' (ID: {c['id']})")
-                return c["id"]
+        exact_id = self.metadata.correspondents_exact.get(name_lower)
+        if exact_id is not None:
+            logger.info("_find_correspondent: EXACT MATCH - %r (ID: %s)", name, exact_id)
+            return exact_id
+        
+        logger.debug("_find_correspondent: No exact match, trying bidirectional prefix matching...")
+        
+        # Single pass collects the first prefix and the first substring candidate
+        # Prefix, case A: "Sheri (Author)" matches "Sheri (Author), UX Collective"
+        # Prefix, case B: "Interaction Design Foundation (IDF)" matches "Interaction Design Foundation"
+        prefix_id = None
+        substring_id = None
+        for existing_lower, _, cid in self.metadata.correspondents_lower:
+            # Suggested is prefix of existing, or existing is prefix of suggested (abbreviations case)
+            if existing_lower.startswith(name_lower) or name_lower.startswith(existing_lower):
+                prefix_id = cid
+                break
+            if substring_id is None and name_lower in existing_lower:
+                substring_id = cid
+        
+        if prefix_id is not None:
+            logger.info("_find_correspondent: PREFIX MATCH - %r (ID: %s)", name, prefix_id)
+            return prefix_id
         
-        logger.info("_find_correspondent: No prefix match, trying core name matching...")
+        logger.debug("_find_correspondent: No prefix match, trying core name matching...")
         
         # Try core name matching (ignore parenthetical suffixes)
         # e.g., "Interaction Design Foundation (IDF)" core = "interaction design foundation"
         # matches "Interaction Design Foundation" core = "interaction design foundation"
-        import re
-        name_core = re.sub(r'\s*\([^)]*\)\s*', '', name_lower).strip()
-        logger.info(f"_find_correspondent: name_core = '{name_core}' (length: {len(name_core)})")
+        name_core = _CORE_RE.sub('', name_lower).strip()
+        logger.debug("_find_correspondent: name_core = %r (length: %d)", name_core, len(name_core))
         
         if name_core and len(name_core) > 10:  # Only if meaningful core remains
-            for c in self.metadata.correspondents:
-                existing_core = re.sub(r'\s*\([^)]*\)\s*', '', c["name"].lower()).strip()
-                logger.info(f"_find_correspondent: comparing '{name_core}' with '{existing_core}'")
-                if name_core == existing_core:
-                    logger.info(f"_find_correspondent: CORE NAME MATCH - '{name}' → '{c['name']}' (ID: {c['id']})")
-                    return c["id"]
+            core_id = self.metadata.correspondents_core.get(name_core)
+            if core_id is not None:
+                logger.info("_find_correspondent: CORE NAME MATCH - %r (ID: %s)", name, core_id)
+                return core_id
         
-        logger.info("_find_correspondent: No core match, trying substring matching...")
+        logger.debug("_find_correspondent: No core match, trying substring matching...")
         
         # Try contains match (for shorter queries)
         # Only if suggested name has significant length (>10 chars)
-        if len(name) > 10:
-            for c in self.metadata.correspondents:
-                if name_lower in c["name"].lower():
-                    logger.info(f"_find_correspondent: SUBSTRING MATCH - '{name}' → '{c['name']}' (ID: {c['id']})")
-                    return c["id"]
+        if len(name) > 10 and substring_id is not None:
+            logger.info("_find_correspondent: SUBSTRING MATCH - %r (ID: %s)", name, substring_id)
+            return substring_id
         
-        logger.info(f"_find_correspondent: NO MATCH FOUND for '{name}'")
+        logger.info("_find_correspondent: NO MATCH FOUND for %r", name)
         return None
     
     async def apply_enrichment(self, document: Document, suggestion: EnrichmentSuggestion) -> bool:
         try:
-            # === EXTENSIVE DEBUG LOGGING ===
-            logger.info("=== APPLY_ENRICHMENT DEBUG START ===")
-            logger.info(f"Document ID: {document.id}")
-            logger.info(f"suggestion.correspondent: {suggestion.correspondent!r}")
-            logger.info(f"suggestion.new_correspondent: {suggestion.new_correspondent!r}")
-            logger.info(f"suggestion.document_type: {suggestion.document_type!r}")
-            logger.info(f"suggestion.new_document_type: {suggestion.new_document_type!r}")
-            logger.info(f"suggestion.tags: {suggestion.tags}")
-            logger.info(f"suggestion.new_tags: {suggestion.new_tags}")
-            logger.info("=== APPLY_ENRICHMENT DEBUG END ===")
+            # === EXTENSIVE DEBUG LOGGING (enable with level=DEBUG) ===
+            logger.debug("=== APPLY_ENRICHMENT DEBUG START ===")
+            logger.debug("Document ID: %s", document.id)
+            logger.debug("suggestion.correspondent: %r", suggestion.correspondent)
+            logger.debug("suggestion.new_correspondent: %r", suggestion.new_correspondent)
+            logger.debug("suggestion.document_type: %r", suggestion.document_type)
+            logger.debug("suggestion.new_document_type: %r", suggestion.new_document_type)
+            logger.debug("suggestion.tags: %s", suggestion.tags)
+            logger.debug("suggestion.new_tags: %s", suggestion.new_tags)
+            logger.debug("=== APPLY_ENRICHMENT DEBUG END ===")
             
-            # Handle correspondent with intelligent fuzzy matching
-            correspondent_id = None
-            if suggestion.new_correspondent:
-                logger.info(f">>> ENTERING new_correspondent branch: '{suggestion.new_correspondent}'")
-                # CRITICAL: Check if correspondent already exists before creating new one
-                # This handles cases where LLM suggests "Org (Abbr)" but "Org" already exists
-                existing_id = self._find_correspondent(suggestion.new_correspondent)
-                logger.info(f">>> _find_correspondent returned: {existing_id}")
-                if existing_id:
-                    logger.info(f"✓ new_correspondent '{suggestion.new_correspondent}' matched existing ID {existing_id} via fuzzy matching")
-                    correspondent_id = existing_id
-                else:
-                    logger.info(f"✗ No match found, creating new correspondent: '{suggestion.new_correspondent}'")
-                    # Truly new correspondent - create it
-                    correspondent_id = await self.paperless.create_correspondent(suggestion.new_correspondent)
-                    self.metadata.correspondents.append({"id": correspondent_id, "name": suggestion.new_correspondent})
-                    logger.info(f"Created new correspondent: {suggestion.new_correspondent} (ID: {correspondent_id})")
-            elif suggestion.correspondent:
-                logger.info(f">>> ENTERING correspondent branch: '{suggestion.correspondent}'")
-                correspondent_id = self._find_correspondent(suggestion.correspondent)
-                logger.info(f">>> _find_correspondent returned: {correspondent_id}")
-            
-            # Handle document type with fuzzy matching
-            type_id = None
-            if suggestion.new_document_type:
-                # Check if type already exists (case-insensitive)
-                doc_type = next((t for t in self.metadata.types if t["name"].lower() == suggestion.new_document_type.lower()), None)
-                if doc_type:
-                    logger.info(f"new_document_type '{suggestion.new_document_type}' matched existing type '{doc_type['name']}' (ID: {doc_type['id']})")
-                    type_id = doc_type["id"]
-                else:
-                    # Truly new type - create it
-                    type_id = await self.paperless.create_document_type(suggestion.new_document_type)
-                    self.metadata.types.append({"id": type_id, "name": suggestion.new_document_type})
-                    logger.info(f"Created new document type: {suggestion.new_document_type} (ID: {type_id})")
-            elif suggestion.document_type:
-                doc_type = next((t for t in self.metadata.types if t["name"].lower() == suggestion.document_type.lower()), None)
-                if doc_type:
-                    type_id = doc_type["id"]
-            
-            # Handle tags with duplicate checking
-            tag_names = suggestion.tags.copy()
-            for new_tag in suggestion.new_tags:
-                # Check if tag already exists (case-insensitive)
-                existing_tag = next((t for t in self.metadata.tags if t["name"].lower() == new_tag.lower()), None)
-                if existing_tag:
-                    logger.info(f"new_tag '{new_tag}' already exists as '{existing_tag['name']}' (ID: {existing_tag['id']}) - skipping creation")
-                    tag_names.append(existing_tag["name"])  # Use existing name
-                else:
-                    # Truly new tag - create it
-                    tag_id = await self.paperless.create_tag(new_tag)
-                    self.metadata.tags.append({"id": tag_id, "name": new_tag})
-                    self.metadata._build_lookups()
-                    tag_names.append(new_tag)
-                    logger.info(f"Created new tag: {new_tag} (ID: {tag_id})")
+            # Correspondent, type and new tags are independent - resolve/create them concurrently
+            correspondent_id, type_id, *new_tag_names = await asyncio.gather(
+                self._resolve_correspondent(suggestion),
+                self._resolve_document_type(suggestion),
+                *[self._resolve_new_tag(new_tag) for new_tag in suggestion.new_tags]
+            )
+            tag_names = suggestion.tags + new_tag_names
             
-            # Get tag IDs
-            tag_ids = self.metadata.get_tag_ids(tag_names)
+            # Get tag IDs, without the NEW tag so a single PATCH also removes it
+            target_tag_id = self.settings["enrichment"]["target_tag_id"]
+            tag_ids = [t for t in self.metadata.get_tag_ids(tag_names) if t != target_tag_id]
             
             # Update document
             await self.paperless.update_document(
@@ -697,12 +1068,6 @@ class EnrichmentService:
                 correspondent=correspondent_id
             )
             
-            # Remove NEW tag
-            target_tag_id = self.settings["enrichment"]["target_tag_id"]
-            if target_tag_id in tag_ids:
-                tag_ids.remove(target_tag_id)
-                await self.paperless.update_document(document.id, tags=tag_ids)
-            
             logger.info(f"✅ Enriched document {document.id}")
             return True
             
@@ -712,9 +1077,44 @@ class EnrichmentService:
 
 
 # Interactive UI
+async def _ainput(prompt: str) -> str:
+    """input() without blocking the event loop.
+
+    The line is read in a daemon thread rather than the default executor:
+    asyncio.run() waits for executor threads on shutdown, so Ctrl-C at the
+    prompt would otherwise hang until the user pressed Enter. Reading goes
+    through sys.stdin, so lines already buffered by an earlier input() are
+    not lost.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def deliver(line: Optional[str]):
+        if future.done():
+            return
+        if line is None:
+            future.set_exception(EOFError())
+        else:
+            future.set_result(line)
+
+    def read():
+        line = sys.stdin.readline()
+        # An empty read is EOF, like input() raising EOFError
+        line = line.rstrip("\r\n") if line else None
+        try:
+            loop.call_soon_threadsafe(deliver, line)
+        except RuntimeError:
+            pass  # Loop already closed - nobody is waiting any more
+
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+
 class InteractiveUI:
     def show_suggestion(self, document: Document, suggestion: EnrichmentSuggestion, metadata: MetadataCache):
-        current_tags = [metadata.tags_by_id[tid]["name"] for tid in document.tags if tid in metadata.tags_by_id]
+        current_tags = metadata.current_tag_names(document)
         
         print(f"\n{'='*80}")
         print(f"📄 Document #{document.id}")
@@ -739,9 +1139,10 @@ class InteractiveUI:
         print(f"\n💭 {suggestion.reasoning}")
         print(f"{'='*80}")
     
-    def get_decision(self) -> DecisionAction:
+    async def get_decision(self) -> DecisionAction:
         while True:
-            response = input("\n👉 [a]pprove / [s]kip / [q]uit: ").lower().strip()
+            # Read off the loop so prefetched suggestions keep running while the user decides
+            response = (await _ainput("\n👉 [a]pprove / [s]kip / [q]uit: ")).lower().strip()
             if response in ['a', 'approve']:
                 return DecisionAction.APPROVE
             elif response in ['s', 'skip']:
@@ -785,23 +1186,35 @@ async def main():
     # Initialize services
     logger.info("Initializing...")
     
+    paperless = PaperlessService(
+        settings["paperless"]["base_url"],
+        settings["paperless"]["api_token"],
+        max_concurrency=settings["paperless"].get("max_concurrency", 32),
+        requests_per_second=settings["paperless"].get("requests_per_second", 20)
+    )
+    
     metadata = MetadataCache(
         base_dir / "data",
         settings["paperless"]["base_url"],
-        settings["paperless"]["api_token"]
+        settings["paperless"]["api_token"],
+        client=paperless.client,
+        max_stale_hours=settings["paperless"].get("metadata_max_stale_hours", 24)
     )
     
+    try:
+        await run(args, base_dir, config, settings, paperless, metadata)
+    finally:
+        await metadata.aclose()
+        await paperless.aclose()
+
+
+async def run(args, base_dir: Path, config: Config, settings: dict, paperless: PaperlessService, metadata: MetadataCache):
     if args.sync:
         print("🔄 Syncing metadata...")
         await metadata.load_from_paperless()
     else:
         await metadata.load_from_cache()
     
-    paperless = PaperlessService(
-        settings["paperless"]["base_url"],
-        settings["paperless"]["api_token"]
-    )
-    
     llm = LLMService(
         settings["lm_studio"],
         config.prompts,
@@ -813,6 +1226,9 @@ async def main():
     if not await llm.check_connection_and_select_model(not args.non_interactive):
         sys.exit(1)
     
+    # Load the model while documents are being fetched
+    warmup = asyncio.create_task(llm.warmup())
+    
     rules = RulesEngine(config.rules)
     service = EnrichmentService(config, metadata, llm, rules, paperless, settings)
     ui = InteractiveUI()
@@ -821,6 +1237,7 @@ async def main():
     target_tag_id = settings["enrichment"]["target_tag_id"]
     print(f"\n🔍 Finding documents with tag ID {target_tag_id}...")
     documents = await paperless.get_documents_with_tag(target_tag_id)
+    await warmup
     
     if not documents:
         print("✅ No documents with 'NEW' tag!")
@@ -835,16 +1252,59 @@ async def main():
     else:
         print(f"   Processing all {len(documents)} documents (batch-size=0, unlimited)")
     
-    # Process
+    # Suggestions are computed ahead of the loop below so LM Studio never idles
+    # between documents; `slots` bounds how far ahead work is started (the queue
+    # itself is unbounded). A slot is taken before a document's suggestion starts
+    # and given back when the loop picks the document up, so interactive runs
+    # stay exactly one document ahead: the next suggestion is computed while the
+    # current one awaits a decision, and may not see tags or correspondents
+    # created by that decision.
+    if args.non_interactive:
+        concurrency = max(1, settings["lm_studio"].get("max_concurrency", 4))
+    else:
+        concurrency = 1
+    sem = asyncio.Semaphore(concurrency)
+    slots = asyncio.Semaphore(concurrency)
+    queue: asyncio.Queue = asyncio.Queue()
+    started: List[asyncio.Task] = []
+    
+    async def enrich(doc: Document) -> EnrichmentSuggestion:
+        async with sem:
+            return await service.enrich_document(doc)
+    
+    async def prefetch():
+        for doc in documents:
+            await slots.acquire()
+            task = asyncio.create_task(enrich(doc))
+            started.append(task)
+            queue.put_nowait((doc, task))
+    
+    producer = asyncio.create_task(prefetch())
+    try:
+        await process(args, settings, service, ui, metadata, documents, queue, slots)
+    finally:
+        # Nothing may outlive the Paperless client closed by our caller
+        producer.cancel()
+        for task in started:
+            task.cancel()
+        await asyncio.gather(producer, *started, return_exceptions=True)
+
+
+async def process(args, settings: dict, service: EnrichmentService, ui: InteractiveUI,
+                  metadata: MetadataCache, documents: List[Document], queue: asyncio.Queue,
+                  slots: asyncio.Semaphore):
     processed = approved = skipped = errors = 0
     
-    for idx, doc in enumerate(documents, 1):
+    for idx in range(1, len(documents) + 1):
+        doc, pending = await queue.get()
+        # Let the next suggestion start while this document is handled
+        slots.release()
         try:
             print(f"\n{'─'*80}")
             print(f"Processing {idx}/{len(documents)}")
             print(f"{'─'*80}")
             
-            suggestion = await service.enrich_document(doc)
+            suggestion = await pending
             
             if not args.non_interactive:
                 ui.show_suggestion(doc, suggestion, metadata)
@@ -858,7 +1318,7 @@ async def main():
                 print(f"\n⏭️  Skipped ({suggestion.confidence:.0%} below threshold)")
                 decision = DecisionAction.SKIP
             else:
-                decision = ui.get_decision()
+                decision = await ui.get_decision()
             
             # Apply
             if decision == DecisionAction.APPROVE:
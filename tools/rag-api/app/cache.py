@@ -0,0 +1,53 @@
+"""In-process cache of the document IDs already indexed in Qdrant."""
+
+import asyncio
+import time
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from .config import get_settings
+
+
+class IndexedDocIdsCache:
+    """TTL cache of indexed doc_id sets, keyed by space (None = whole collection).
+
+    Successful ingests write through with add(); operations that delete
+    vectors call clear(). Entries otherwise expire after `ttl` seconds, which
+    bounds staleness from writes made outside this process.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.lock = asyncio.Lock()
+        self._entries: Dict[Optional[str], Tuple[Set[int], float]] = {}
+
+    async def get(self, space_id: Optional[str], load: Callable[[], Awaitable[Set[int]]]) -> Set[int]:
+        """Return the indexed doc_ids for a space, calling `load()` on a miss or expiry."""
+        async with self.lock:
+            entry = self._entries.get(space_id)
+            if entry is not None and time.monotonic() < entry[1]:
+                return set(entry[0])
+
+            ids = await load()
+            self._entries[space_id] = (ids, time.monotonic() + self.ttl)
+            return set(ids)
+
+    def add(self, doc_id: int, space_ids: Iterable[str]):
+        """Record a freshly ingested document under the spaces its chunks carry."""
+        space_ids = set(space_ids)
+        for key, (ids, _) in self._entries.items():
+            if key is None or key in space_ids:
+                ids.add(doc_id)
+            else:
+                # A reindex may have moved the document out of this space
+                ids.discard(doc_id)
+
+    def clear(self):
+        """Drop every entry, e.g. after the collection or a space was wiped."""
+        self._entries.clear()
+
+
+@lru_cache()
+def get_indexed_ids_cache() -> IndexedDocIdsCache:
+    """Get the process-wide indexed doc_id cache."""
+    return IndexedDocIdsCache(get_settings().INDEXED_IDS_CACHE_TTL)
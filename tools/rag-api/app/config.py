@@ -13,6 +13,11 @@ class Settings(BaseSettings):
     # Paperless-ngx Configuration
     PAPERLESS_BASE_URL: str
     PAPERLESS_API_TOKEN: str
+    # Connection pool of the shared Paperless client - size to what Paperless can serve
+    PAPERLESS_MAX_CONNECTIONS: int = 1000
+    PAPERLESS_MAX_KEEPALIVE: int = 100
+    # Page requests in flight when listing all documents
+    PAPERLESS_PAGE_CONCURRENCY: int = 5
     
     # OpenRouter Configuration
     OPENROUTER_API_KEY: str
@@ -25,6 +30,12 @@ class Settings(BaseSettings):
     
     # Embedding Configuration
     EMBEDDING_MODEL: str = "BAAI/bge-m3"
+    # "torch" (FP32), "torch-int8" (dynamic int8 quantization, CPU) or "onnx" (ONNX Runtime)
+    EMBEDDING_BACKEND: str = "torch"
+    # ONNX file inside the model repo; quantized variants exist for many models
+    EMBEDDING_ONNX_FILE: str = "onnx/model.onnx"
+    # Intra-op threads for torch inference (0 = torch default)
+    EMBEDDING_THREADS: int = 0
     
     # RAG Configuration
     RAG_TOP_K: int = 6
@@ -32,6 +43,16 @@ class Settings(BaseSettings):
     CHUNK_OVERLAP: int = 120
     MAX_SNIPPETS_TOKENS: int = 2500
 
+    # Query embedding / search result caches for /ask (entries, seconds)
+    QUERY_CACHE_SIZE: int = 10000
+    QUERY_CACHE_TTL: int = 600
+
+    # Seconds the set of indexed doc_ids is reused before Qdrant is asked again
+    INDEXED_IDS_CACHE_TTL: int = 60
+
+    # Documents ingested concurrently by /sync and background ingestion
+    INGEST_CONCURRENCY: int = 4
+
     # Space Configuration
     SPACE_CUSTOM_FIELD_NAME: str = "RAG Spaces"
     
@@ -64,7 +85,7 @@ class Settings(BaseSettings):
     }
 
 
-@lru_cache()
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get cached settings instance."""
+    """Get cached settings instance (env and .env are read once per process)."""
     return Settings()
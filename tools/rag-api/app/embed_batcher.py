@@ -0,0 +1,97 @@
+"""Cross-document batching of embedding requests."""
+
+import asyncio
+import logging
+from typing import List, Optional, Set, Tuple
+
+from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+
+class EmbedBatcher:
+    """Coalesce concurrent encode requests into large model.encode() calls.
+
+    Concurrent ingests each submit their chunk texts; pending texts are flushed
+    as one batch once `max_batch` accumulate or `flush_every` seconds pass.
+    SentenceTransformer.encode already sorts each batch by length, so merging
+    documents means less padding and fewer tokenizer/forward-pass calls.
+    Batches are encoded one at a time in a worker thread, keeping the event
+    loop free and letting the next batch grow while the current one runs.
+    """
+
+    def __init__(
+        self,
+        model: SentenceTransformer,
+        max_batch: int = 256,
+        flush_every: float = 0.05,
+        batch_size: int = 64,
+    ):
+        self.model = model
+        self.max_batch = max_batch
+        self.flush_every = flush_every
+        self.batch_size = batch_size
+        # One (future, texts) entry per encode_many() call awaiting the next flush
+        self.pending: List[Tuple[asyncio.Future, List[str]]] = []
+        self._pending_count = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._encode_lock = asyncio.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def encode_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts as part of the next batch; returns one vector per text, in order."""
+        if not texts:
+            return []
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((future, texts))
+        self._pending_count += len(texts)
+
+        if self._pending_count >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.flush_every, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self.pending = self.pending, []
+        self._pending_count = 0
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._encode(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _encode(self, batch: List[Tuple[asyncio.Future, List[str]]]):
+        texts = [text for _, request_texts in batch for text in request_texts]
+        try:
+            async with self._encode_lock:
+                logger.debug(f"Encoding batch of {len(texts)} chunks")
+                embeddings = await asyncio.to_thread(
+                    self.model.encode, texts, batch_size=self.batch_size, convert_to_numpy=True
+                )
+        except Exception as e:
+            for future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        # Hand each caller back its own slice of the batch
+        start = 0
+        for future, request_texts in batch:
+            stop = start + len(request_texts)
+            # The requesting ingest may have been cancelled meanwhile
+            if not future.done():
+                future.set_result(embeddings[start:stop].tolist())
+            start = stop
+
+    async def aclose(self):
+        """Flush anything still pending and wait for in-flight batches."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -1,8 +1,16 @@
 """Text extraction utilities for different document types."""
 
+import codecs
 import logging
+import mmap
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
 from io import BytesIO
-from typing import List, Tuple, Optional
+from typing import Callable, Iterator, List, Tuple, Optional
 import re
 
 try:
@@ -10,6 +18,11 @@ try:
 except ImportError:
     from PyPDF2 import PdfReader
 
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
 try:
     import docx
 except ImportError:
@@ -20,11 +33,21 @@ try:
 except ImportError:
     markdown = None
 
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
 try:
     from bs4 import BeautifulSoup
 except ImportError:
     BeautifulSoup = None
 
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
 try:
     import openpyxl
 except ImportError:
@@ -35,8 +58,53 @@ try:
 except ImportError:
     Presentation = None
 
+try:
+    from charset_normalizer import from_bytes
+except ImportError:
+    from_bytes = None
+
 logger = logging.getLogger(__name__)
 
+# PDFs with at least this many pages are extracted across a process pool
+PDF_PARALLEL_MIN_PAGES = 8
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+# PDFium is not thread-safe, not even across documents, and ingests extract in
+# worker threads - every PDFium call in this process holds the lock. Reentrant,
+# so a garbage-collected generator closing its PDF mid-call cannot deadlock.
+_pdfium_lock = threading.RLock()
+
+_EXTENSION_TYPES = {
+    '.pdf': 'pdf',
+    '.docx': 'docx',
+    '.txt': 'txt', '.text': 'txt',
+    '.md': 'md', '.markdown': 'md',
+    '.html': 'html', '.htm': 'html',
+    '.xlsx': 'xlsx', '.xlsm': 'xlsx',
+    '.xls': 'xls',  # Old Excel format
+    '.pptx': 'pptx',
+    '.ppt': 'ppt',  # Old PowerPoint format
+}
+
+# Content sniffing for files without a known extension
+_HTML_RE = re.compile(rb'<(?:html|!doctype html)', re.IGNORECASE)
+_OOXML_PARTS = (('word/', 'docx'), ('xl/', 'xlsx'), ('ppt/', 'pptx'))
+
+# Markdown syntax stripped when text is not rendered through the markdown library
+_MD_HEADER = re.compile(r'#{1,6}\s+')
+_MD_BOLD = re.compile(r'\*\*(.+?)\*\*')
+_MD_ITAL = re.compile(r'\*(.+?)\*')
+_MD_CODE = re.compile(r'`(.+?)`')
+_MD_LINK = re.compile(r'\[(.+?)\]\(.+?\)')
+
+# Runs of whitespace, null characters and OCR artifacts (anything outside word
+# characters and common punctuation), collapsed to one space in a single pass
+_RE_CLEAN = re.compile(r'[^\w\-.,;:!?()[\]{}"\'/\\@#$%^&*+=<>~`|]+')
+
+# The same filter for pure-ASCII text as a translate table (disallowed -> space)
+_KEEP = set('_-.,;:!?()[]{}"\'/\\@#$%^&*+=<>~`|')
+_ASCII_CLEAN_TABLE = str.maketrans({c: ' ' for c in range(128) if not (chr(c).isalnum() or chr(c) in _KEEP)})
+
 
 def clean_text(text: str) -> str:
     """
@@ -51,53 +119,220 @@ def clean_text(text: str) -> str:
     if not text:
         return ""
     
-    # Remove null characters
-    text = text.replace("\x00", " ")
+    # Normalize whitespace and strip null characters and OCR artifacts
+    if text.isascii():
+        # translate maps every disallowed character to a space, split/join collapses the runs
+        return ' '.join(text.translate(_ASCII_CLEAN_TABLE).split())
+    text = _RE_CLEAN.sub(' ', text)
     
-    # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove excessive newlines but preserve paragraph breaks
-    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+    return text.strip()
+
+
+class _MappedFile(mmap.mmap):
+    """Read-only memory map usable wherever zipfile expects a file (mmap lacks seekable() before 3.13)."""
     
-    # Clean up common OCR artifacts
-    text = re.sub(r'[^\w\s\-.,;:!?()[\]{}"\'/\\@#$%^&*+=<>~`|]', ' ', text)
+    def seekable(self) -> bool:
+        return True
+
+
+def _stream(binary_content: bytes):
+    """
+    File-like view of file content for the parser libraries.
     
-    return text.strip()
+    A memory-mapped file already is one (rewound here); bytes get a BytesIO.
+    """
+    if isinstance(binary_content, mmap.mmap):
+        binary_content.seek(0)
+        return binary_content
+    return BytesIO(binary_content)
 
 
-def extract_pdf_text(binary_content: bytes) -> List[Tuple[int, str]]:
+def _decode_bytes(binary_content: bytes) -> str:
     """
-    Extract text from PDF file.
+    Decode text file content, detecting the encoding if it isn't UTF-8.
     
     Args:
-        binary_content: PDF file content as bytes
+        binary_content: Text file content as bytes
     
     Returns:
-        List of tuples containing (page_number, text_content)
+        Decoded text
     """
-    pages = []
+    if isinstance(binary_content, mmap.mmap):
+        binary_content = binary_content[:]
     
+    # Most files are UTF-8 - one strict decode settles them
     try:
-        reader = PdfReader(BytesIO(binary_content))
+        return binary_content.decode('utf-8')
+    except UnicodeDecodeError:
+        pass
+    
+    if from_bytes is not None:
+        best = from_bytes(binary_content).best()
+        if best is not None:
+            return str(best)
+    else:
+        # Try different encodings
+        for encoding in ('utf-16', 'latin-1', 'cp1252'):
+            try:
+                return binary_content.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+    
+    # If detection fails, use utf-8 with error handling
+    return binary_content.decode('utf-8', errors='replace')
+
+
+def _pdfium_page_text(pdf, index: int) -> str:
+    with _pdfium_lock:
+        page = pdf[index]
+        try:
+            textpage = page.get_textpage()
+            try:
+                return textpage.get_text_range()
+            finally:
+                textpage.close()
+        finally:
+            page.close()
+
+
+@contextmanager
+def _open_pdf(source) -> Iterator[Tuple[int, Callable[[int], str]]]:
+    """
+    Open a PDF with PDFium (pypdfium2) when installed, falling back to pypdf.
+    
+    A PDFium document is closed explicitly on exit, so it is never freed
+    by the garbage collector outside the lock.
+    
+    Args:
+        source: PDF file content as bytes or memory-mapped file, or a file path
+    
+    Yields:
+        Tuple of (page_count, function returning the raw text of a page by index)
+    """
+    pdf = None
+    if pdfium is not None:
+        try:
+            with _pdfium_lock:
+                opened = pdfium.PdfDocument(source[:] if isinstance(source, mmap.mmap) else source)
+                try:
+                    page_count = len(opened)
+                except Exception:
+                    opened.close()
+                    raise
+            pdf = opened
+        except Exception as e:
+            logger.warning(f"PDFium failed to open PDF, falling back to pypdf: {e}")
+    
+    if pdf is not None:
+        try:
+            yield page_count, lambda index: _pdfium_page_text(pdf, index)
+        finally:
+            with _pdfium_lock:
+                pdf.close()
+        return
+    
+    pages = PdfReader(source if isinstance(source, str) else _stream(source)).pages
+    yield len(pages), lambda index: pages[index].extract_text()
+
+
+def _iter_pdf_page_range(page_text: Callable[[int], str], start: int, stop: int) -> Iterator[Tuple[int, str]]:
+    """Extract and clean pages start..stop-1, skipping pages without text."""
+    for index in range(start, stop):
+        page_num = index + 1
+        try:
+            text = page_text(index) or ""
+            cleaned_text = clean_text(text)
+        except Exception as e:
+            logger.warning(f"Failed to extract text from page {page_num}: {e}")
+            continue
         
-        for page_num, page in enumerate(reader.pages, start=1):
+        if cleaned_text:  # Only yield pages with actual content
+            yield page_num, cleaned_text
+
+
+def _extract_pdf_page_range(source, start: int, stop: int) -> List[Tuple[int, str]]:
+    """Process pool worker: parse the PDF (bytes or path) and extract one contiguous range of pages."""
+    with _open_pdf(source) as (_, page_text):
+        return list(_iter_pdf_page_range(page_text, start, stop))
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    if _pdf_pool is None:
+        # spawn: forking a process that holds torch/uvicorn threads is unsafe
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pdf_pool
+
+
+def shutdown_pdf_pool() -> None:
+    """Stop the PDF extraction worker processes, if any were started."""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(cancel_futures=True)
+        _pdf_pool = None
+
+
+def iter_pdf_pages(binary_content: bytes, path: Optional[str] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Extract text from PDF file one page at a time.
+    
+    Large PDFs are split into one contiguous page range per CPU and extracted
+    in a process pool; pages are still yielded in order.
+    
+    Args:
+        binary_content: PDF file content as bytes (or memory-mapped file)
+        path: Path of the file on disk, if any; lets pool workers open it themselves
+    
+    Yields:
+        Tuples of (page_number, text_content) for pages with text
+    """
+    # A path lets PDFium (and pool workers) read the file directly
+    source = path if path is not None else binary_content
+    with ExitStack() as stack:
+        try:
+            page_count, page_text = stack.enter_context(_open_pdf(source))
+        except Exception as e:
+            logger.error(f"Failed to parse PDF: {e}")
+            raise ValueError(f"Unable to parse PDF: {e}")
+        
+        workers = os.cpu_count() or 1
+        if page_count < PDF_PARALLEL_MIN_PAGES or workers < 2 or not isinstance(source, (str, bytes)):
+            yield from _iter_pdf_page_range(page_text, 0, page_count)
+            return
+        
+        # One range per worker, so the PDF bytes are pickled once per worker, not per page
+        step = -(-page_count // workers)
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        try:
+            pool = _get_pdf_pool()
+            futures = [pool.submit(_extract_pdf_page_range, source, start, stop) for start, stop in ranges]
+        except Exception as e:
+            logger.warning(f"PDF process pool unavailable, extracting serially: {e}")
+            yield from _iter_pdf_page_range(page_text, 0, page_count)
+            return
+        
+        for (start, stop), future in zip(ranges, futures):
             try:
-                text = page.extract_text() or ""
-                cleaned_text = clean_text(text)
-                
-                if cleaned_text:  # Only add pages with actual content
-                    pages.append((page_num, cleaned_text))
-                    
+                yield from future.result()
             except Exception as e:
-                logger.warning(f"Failed to extract text from page {page_num}: {e}")
-                continue
-                
-    except Exception as e:
-        logger.error(f"Failed to parse PDF: {e}")
-        raise ValueError(f"Unable to parse PDF: {e}")
+                logger.warning(f"Parallel extraction of pages {start + 1}-{stop} failed, retrying serially: {e}")
+                yield from _iter_pdf_page_range(page_text, start, stop)
+
+
+def extract_pdf_text(binary_content: bytes) -> List[Tuple[int, str]]:
+    """
+    Extract text from PDF file.
     
-    return pages
+    Args:
+        binary_content: PDF file content as bytes
+    
+    Returns:
+        List of tuples containing (page_number, text_content)
+    """
+    return list(iter_pdf_pages(binary_content))
 
 
 def extract_docx_text(binary_content: bytes) -> str:
@@ -114,7 +349,7 @@ def extract_docx_text(binary_content: bytes) -> str:
         raise ImportError("python-docx package is required for DOCX extraction")
     
     try:
-        document = docx.Document(BytesIO(binary_content))
+        document = docx.Document(_stream(binary_content))
         
         # Extract text from paragraphs
         paragraphs = []
@@ -153,25 +388,40 @@ def extract_txt_text(binary_content: bytes) -> str:
         Extracted text content
     """
     try:
-        # Try different encodings
-        encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
-        
-        for encoding in encodings:
-            try:
-                text = binary_content.decode(encoding)
-                return clean_text(text)
-            except UnicodeDecodeError:
-                continue
-        
-        # If all encodings fail, use utf-8 with error handling
-        text = binary_content.decode('utf-8', errors='replace')
-        return clean_text(text)
+        return clean_text(_decode_bytes(binary_content))
         
     except Exception as e:
         logger.error(f"Failed to decode text file: {e}")
         raise ValueError(f"Unable to decode text file: {e}")
 
 
+def _html_to_text(html_content: str) -> str:
+    """
+    Get the visible text of an HTML document, without script and style contents.
+    
+    Uses the selectolax C parser when installed, BeautifulSoup otherwise.
+    
+    Args:
+        html_content: HTML markup
+    
+    Returns:
+        Text content, separated by spaces
+    """
+    if HTMLParser is not None:
+        tree = HTMLParser(html_content)
+        for node in tree.css('script, style'):
+            node.decompose()
+        return tree.text(separator=' ')
+    
+    soup = BeautifulSoup(html_content, 'html.parser')
+    
+    # Remove script and style elements
+    for script in soup(["script", "style"]):
+        script.decompose()
+    
+    return soup.get_text(separator=' ')
+
+
 def extract_markdown_text(binary_content: bytes) -> str:
     """
     Extract text from Markdown file.
@@ -183,23 +433,23 @@ def extract_markdown_text(binary_content: bytes) -> str:
         Extracted text content (markdown converted to plain text)
     """
     try:
-        # First decode as text
-        text = extract_txt_text(binary_content)
+        # Decode only; clean_text runs once on the final plain text so the
+        # markdown structure (line breaks, headers, lists) survives until then
+        text = _decode_bytes(binary_content)
         
-        # If markdown library is available, convert to HTML then strip tags
-        if markdown and BeautifulSoup:
+        # Links, images and inline HTML need a real render to drop the markup;
+        # plain prose is handled by the regex strip without the HTML round-trip
+        needs_render = '](' in text or '<' in text
+        if needs_render and markdown and (HTMLParser or BeautifulSoup):
             html = markdown.markdown(text)
-            soup = BeautifulSoup(html, 'html.parser')
-            plain_text = soup.get_text(separator=' ')
-            return clean_text(plain_text)
+            return clean_text(_html_to_text(html))
         else:
-            # Fallback: just return the raw markdown as text
             # Strip common markdown syntax for better readability
-            text = re.sub(r'#{1,6}\s+', '', text)  # Remove headers
-            text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)  # Remove bold
-            text = re.sub(r'\*(.+?)\*', r'\1', text)  # Remove italic
-            text = re.sub(r'`(.+?)`', r'\1', text)  # Remove code
-            text = re.sub(r'\[(.+?)\]\(.+?\)', r'\1', text)  # Remove links, keep text
+            text = _MD_HEADER.sub('', text)  # Remove headers
+            text = _MD_BOLD.sub(r'\1', text)  # Remove bold
+            text = _MD_ITAL.sub(r'\1', text)  # Remove italic
+            text = _MD_CODE.sub(r'\1', text)  # Remove code
+            text = _MD_LINK.sub(r'\1', text)  # Remove links, keep text
             return clean_text(text)
         
     except Exception as e:
@@ -217,33 +467,15 @@ def extract_html_text(binary_content: bytes) -> str:
     Returns:
         Extracted text content
     """
-    if BeautifulSoup is None:
-        raise ImportError("beautifulsoup4 package is required for HTML extraction")
+    if HTMLParser is None and BeautifulSoup is None:
+        raise ImportError("selectolax or beautifulsoup4 package is required for HTML extraction")
     
     try:
         # Decode HTML
-        encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
-        html_content = None
-        
-        for encoding in encodings:
-            try:
-                html_content = binary_content.decode(encoding)
-                break
-            except UnicodeDecodeError:
-                continue
-        
-        if not html_content:
-            html_content = binary_content.decode('utf-8', errors='replace')
+        html_content = _decode_bytes(binary_content)
         
         # Parse HTML and extract text
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Get text
-        text = soup.get_text(separator=' ')
+        text = _html_to_text(html_content)
         return clean_text(text)
         
     except Exception as e:
@@ -251,6 +483,38 @@ def extract_html_text(binary_content: bytes) -> str:
         raise ValueError(f"Unable to parse HTML: {e}")
 
 
+def _iter_workbook_rows(binary_content: bytes) -> Iterator[Tuple[str, Iterator[tuple]]]:
+    """
+    Iterate the sheets of a workbook as (sheet_name, rows of cell values).
+    
+    Reads with the Rust-backed python-calamine when installed, openpyxl otherwise.
+    """
+    if CalamineWorkbook is not None:
+        workbook = CalamineWorkbook.from_filelike(_stream(binary_content))
+        for sheet_name in workbook.sheet_names:
+            yield sheet_name, iter(workbook.get_sheet_by_name(sheet_name).to_python())
+        return
+    
+    # Read-only mode streams the sheet XML without building Cell objects or styles
+    workbook = openpyxl.load_workbook(
+        _stream(binary_content), read_only=True, data_only=True, keep_links=False
+    )
+    try:
+        for sheet_name in workbook.sheetnames:
+            yield sheet_name, workbook[sheet_name].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _cell_to_str(cell) -> str:
+    if cell is None:
+        return ""
+    # calamine reports every number as float - print whole numbers like openpyxl does
+    if isinstance(cell, float) and cell.is_integer():
+        return str(int(cell))
+    return str(cell)
+
+
 def extract_xlsx_text(binary_content: bytes) -> str:
     """
     Extract text from Excel file.
@@ -261,19 +525,16 @@ def extract_xlsx_text(binary_content: bytes) -> str:
     Returns:
         Extracted text content
     """
-    if openpyxl is None:
-        raise ImportError("openpyxl package is required for Excel extraction")
+    if CalamineWorkbook is None and openpyxl is None:
+        raise ImportError("python-calamine or openpyxl package is required for Excel extraction")
     
     try:
-        workbook = openpyxl.load_workbook(BytesIO(binary_content), data_only=True)
-        
         all_text = []
-        for sheet_name in workbook.sheetnames:
-            sheet = workbook[sheet_name]
+        for sheet_name, rows in _iter_workbook_rows(binary_content):
             all_text.append(f"Sheet: {sheet_name}")
             
-            for row in sheet.iter_rows(values_only=True):
-                row_values = [str(cell) if cell is not None else "" for cell in row]
+            for row in rows:
+                row_values = [_cell_to_str(cell) for cell in row]
                 row_text = " | ".join(row_values).strip()
                 if row_text:
                     all_text.append(row_text)
@@ -299,7 +560,7 @@ def extract_pptx_text(binary_content: bytes) -> str:
         raise ImportError("python-pptx package is required for PowerPoint extraction")
     
     try:
-        prs = Presentation(BytesIO(binary_content))
+        prs = Presentation(_stream(binary_content))
         
         all_text = []
         for i, slide in enumerate(prs.slides, start=1):
@@ -327,47 +588,43 @@ def detect_file_type(filename: str, content: bytes) -> str:
     Returns:
         File type string ('pdf', 'docx', 'txt', 'md', 'html', 'xlsx', 'pptx', 'unknown')
     """
-    filename_lower = filename.lower()
-    
-    # Check by file extension first
-    if filename_lower.endswith('.pdf'):
-        return 'pdf'
-    elif filename_lower.endswith('.docx'):
-        return 'docx'
-    elif filename_lower.endswith(('.txt', '.text')):
-        return 'txt'
-    elif filename_lower.endswith(('.md', '.markdown')):
-        return 'md'
-    elif filename_lower.endswith(('.html', '.htm')):
-        return 'html'
-    elif filename_lower.endswith(('.xlsx', '.xlsm')):
-        return 'xlsx'
-    elif filename_lower.endswith('.xls'):
-        return 'xls'  # Old Excel format
-    elif filename_lower.endswith('.pptx'):
-        return 'pptx'
-    elif filename_lower.endswith('.ppt'):
-        return 'ppt'  # Old PowerPoint format
+    # Check by file extension first - a known extension never looks at the content
+    dot = filename.rfind('.')
+    if dot != -1:
+        file_type = _EXTENSION_TYPES.get(filename[dot:].lower())
+        if file_type:
+            return file_type
     
     # Check by file signature (magic bytes)
-    if content.startswith(b'%PDF'):
+    magic = content[:4]
+    if magic == b'%PDF':
         return 'pdf'
-    elif content.startswith(b'PK\x03\x04'):
+    elif magic == b'PK\x03\x04':
         # This is a ZIP-based format, check what's inside
-        if b'word/' in content[:2048]:
-            return 'docx'
-        elif b'xl/' in content[:2048]:
-            return 'xlsx'
-        elif b'ppt/' in content[:2048]:
-            return 'pptx'
+        try:
+            names = zipfile.ZipFile(_stream(content)).namelist()
+        except zipfile.BadZipFile:
+            names = None
+        if names is not None:
+            for name in names:
+                for part, file_type in _OOXML_PARTS:
+                    if name.startswith(part):
+                        return file_type
+        else:
+            # Damaged archive - fall back to looking for part names near the start
+            head = content[:2048]
+            for part, file_type in _OOXML_PARTS:
+                if part.encode() in head:
+                    return file_type
     
     # Check for HTML
-    if b'<html' in content[:1024].lower() or b'<!doctype html' in content[:1024].lower():
+    if _HTML_RE.search(content, 0, 1024):
         return 'html'
     
-    # Default to txt for other text-like content
+    # Default to txt for other text-like content; the incremental decoder
+    # tolerates a multi-byte character cut off at the end of the sample
     try:
-        content[:1024].decode('utf-8')
+        codecs.getincrementaldecoder('utf-8')().decode(content[:1024])
         return 'txt'
     except UnicodeDecodeError:
         pass
@@ -375,51 +632,101 @@ def detect_file_type(filename: str, content: bytes) -> str:
     return 'unknown'
 
 
-def extract_text_from_file(filename: str, binary_content: bytes) -> List[Tuple[Optional[int], str]]:
+def iter_text_from_file(filename: str, binary_content: bytes, path: Optional[str] = None) -> Iterator[Tuple[Optional[int], str]]:
     """
-    Extract text from a file based on its type.
+    Extract text from a file based on its type, yielding pages as they are extracted.
     
     Args:
         filename: Original filename
-        binary_content: File content as bytes
+        binary_content: File content as bytes (or memory-mapped file)
+        path: Path of the file on disk, if any
     
-    Returns:
-        List of tuples containing (page_number, text_content)
+    Yields:
+        Tuples of (page_number, text_content)
         For non-paginated formats, page_number will be None
     """
     file_type = detect_file_type(filename, binary_content)
     
     try:
         if file_type == 'pdf':
-            return extract_pdf_text(binary_content)
+            yield from iter_pdf_pages(binary_content, path)
+            return
         elif file_type == 'docx':
             text = extract_docx_text(binary_content)
-            return [(None, text)] if text else []
         elif file_type == 'txt':
             text = extract_txt_text(binary_content)
-            return [(None, text)] if text else []
         elif file_type == 'md':
             text = extract_markdown_text(binary_content)
-            return [(None, text)] if text else []
         elif file_type == 'html':
             text = extract_html_text(binary_content)
-            return [(None, text)] if text else []
         elif file_type in ('xlsx', 'xls'):
             text = extract_xlsx_text(binary_content)
-            return [(None, text)] if text else []
         elif file_type in ('pptx', 'ppt'):
             text = extract_pptx_text(binary_content)
-            return [(None, text)] if text else []
         else:
             logger.warning(f"Unsupported file type '{file_type}' for file '{filename}'")
-            return []
+            return
+        
+        if text:
+            yield None, text
             
     except ImportError as e:
         logger.warning(f"Missing library for {file_type}: {e}. File '{filename}' will be skipped.")
-        return []
     except Exception as e:
         logger.error(f"Failed to extract text from {filename}: {e}")
-        return []
+
+
+def extract_text_from_file(filename: str, binary_content: bytes) -> List[Tuple[Optional[int], str]]:
+    """
+    Extract text from a file based on its type.
+    
+    Args:
+        filename: Original filename
+        binary_content: File content as bytes
+    
+    Returns:
+        List of tuples containing (page_number, text_content)
+        For non-paginated formats, page_number will be None
+    """
+    return list(iter_text_from_file(filename, binary_content))
+
+
+def iter_text_from_path(path: str, filename: Optional[str] = None) -> Iterator[Tuple[Optional[int], str]]:
+    """
+    Extract text from a file on disk without reading it into memory first.
+    
+    The file is memory-mapped, so the parsers read only the regions they touch
+    and the kernel page cache backs them instead of a private copy.
+    
+    Args:
+        path: Path of the file
+        filename: Original filename used for type detection (defaults to the path's name)
+    
+    Yields:
+        Tuples of (page_number, text_content)
+    """
+    filename = filename or os.path.basename(path)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            logger.warning(f"File '{filename}' is empty")
+            return
+        with _MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            yield from iter_text_from_file(filename, content, path)
+
+
+def extract_text_from_path(path: str, filename: Optional[str] = None) -> List[Tuple[Optional[int], str]]:
+    """
+    Extract text from a file on disk without reading it into memory first.
+    
+    Args:
+        path: Path of the file
+        filename: Original filename used for type detection (defaults to the path's name)
+    
+    Returns:
+        List of tuples containing (page_number, text_content)
+        For non-paginated formats, page_number will be None
+    """
+    return list(iter_text_from_path(path, filename))
 
 
 def get_supported_extensions() -> List[str]:
@@ -434,7 +741,7 @@ def get_supported_extensions() -> List[str]:
     # Add extensions for optional dependencies
     if docx:
         extensions.append('.docx')
-    if openpyxl:
+    if CalamineWorkbook or openpyxl:
         extensions.extend(['.xlsx', '.xlsm', '.xls'])
     if Presentation:
         extensions.extend(['.pptx', '.ppt'])
@@ -1,17 +1,22 @@
 """Document ingestion and text chunking for the vector database."""
 
+import asyncio
 import logging
 import math
-from typing import List, Dict, Any, Optional
+import os
+import tempfile
+from typing import AsyncIterator, Iterator, List, Dict, Any, Optional, TypeVar
 from datetime import datetime
 import tiktoken
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, MatchValue, PayloadSchemaType
 from sentence_transformers import SentenceTransformer
 
 from .config import get_settings
-from .extractors import extract_text_from_file
-from .paperless import get_document, download_document, get_document_spaces
+from .embed_batcher import EmbedBatcher
+from .extractors import iter_text_from_path
+from .paperless import get_document, stream_document, get_document_spaces
+from .query_cache import invalidate_retrieval_cache
 from .spaces_config import get_space_params
 
 logger = logging.getLogger(__name__)
@@ -20,6 +25,12 @@ settings = get_settings()
 # Collection name for storing document chunks
 COLLECTION_NAME = "paperless_chunks"
 
+# Payload fields indexed for filtering and faceting (doc_id feeds the indexed-ID lookups)
+PAYLOAD_INDEXES = {
+    "doc_id": PayloadSchemaType.INTEGER,
+    "space_ids": PayloadSchemaType.KEYWORD,
+}
+
 # Initialize tokenizer for counting tokens
 try:
     tokenizer = tiktoken.get_encoding("cl100k_base")
@@ -93,7 +104,7 @@ def chunk_text(text: str, chunk_tokens: int = None, overlap_tokens: int = None)
         return chunks
 
 
-def ensure_collection(qdrant_client: QdrantClient, embedding_dimension: int):
+async def ensure_collection(qdrant_client: AsyncQdrantClient, embedding_dimension: int):
     """
     Ensure the Qdrant collection exists with the correct configuration.
     
@@ -102,25 +113,36 @@ def ensure_collection(qdrant_client: QdrantClient, embedding_dimension: int):
         embedding_dimension: Dimension of embedding vectors
     """
     try:
-        collections = qdrant_client.get_collections()
+        collections = await qdrant_client.get_collections()
         collection_names = [c.name for c in collections.collections]
         
         if COLLECTION_NAME not in collection_names:
             logger.info(f"Creating collection '{COLLECTION_NAME}'")
-            qdrant_client.recreate_collection(
+            await qdrant_client.recreate_collection(
                 collection_name=COLLECTION_NAME,
                 vectors_config=VectorParams(size=embedding_dimension, distance=Distance.COSINE)
             )
         else:
             logger.info(f"Collection '{COLLECTION_NAME}' already exists")
+        
+        # Collections created before the indexes existed get them on next startup
+        payload_schema = (await qdrant_client.get_collection(COLLECTION_NAME)).payload_schema
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            if field_name not in payload_schema:
+                logger.info(f"Creating payload index on '{field_name}'")
+                await qdrant_client.create_payload_index(
+                    collection_name=COLLECTION_NAME,
+                    field_name=field_name,
+                    field_schema=field_schema
+                )
             
     except Exception as e:
         logger.error(f"Failed to ensure collection: {e}")
         raise
 
 
-def upsert_chunks_to_qdrant(
-    qdrant_client: QdrantClient,
+async def upsert_chunks_to_qdrant(
+    qdrant_client: AsyncQdrantClient,
     chunks: List[Dict[str, Any]],
     vectors: List[List[float]]
 ):
@@ -150,18 +172,55 @@ def upsert_chunks_to_qdrant(
         ))
     
     try:
-        qdrant_client.upsert(collection_name=COLLECTION_NAME, points=points)
+        await qdrant_client.upsert(collection_name=COLLECTION_NAME, points=points)
+        invalidate_retrieval_cache()
         logger.info(f"Upserted {len(points)} chunks to Qdrant")
     except Exception as e:
         logger.error(f"Failed to upsert chunks to Qdrant: {e}")
         raise
 
 
+T = TypeVar("T")
+
+_EXHAUSTED = object()
+
+
+async def _iterate_in_thread(iterator: Iterator[T]) -> AsyncIterator[T]:
+    """Advance a blocking iterator in worker threads, handing each item back to the event loop.
+
+    Text extraction parses files and waits on the PDF process pool; running
+    each step off the loop keeps other requests and concurrent ingests moving
+    while still holding only one page's text at a time.
+    """
+    step: Optional[asyncio.Task] = None
+    try:
+        while True:
+            step = asyncio.ensure_future(asyncio.to_thread(next, iterator, _EXHAUSTED))
+            # Shielded: cancelling the caller does not stop the worker thread
+            item = await asyncio.shield(step)
+            if item is _EXHAUSTED:
+                return
+            yield item
+    finally:
+        if step is not None and not step.done():
+            # The thread is still inside the generator - closing it now would raise
+            # "generator already executing" and leave the file mapped
+            await asyncio.wait([step])
+            if not step.cancelled():
+                step.exception()  # Retrieved so it isn't logged as never retrieved
+        # Release the generator's file/mmap even if the caller stopped early
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
 async def ingest_document(
     doc_id: int,
-    qdrant_client: QdrantClient,
+    qdrant_client: AsyncQdrantClient,
     embedding_model: SentenceTransformer,
-    force_reindex: bool = False
+    force_reindex: bool = False,
+    embed_batcher: Optional[EmbedBatcher] = None,
+    doc_metadata: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     Ingest a single document into the vector database.
@@ -171,6 +230,9 @@ async def ingest_document(
         qdrant_client: Qdrant client instance
         embedding_model: Sentence transformer model for embeddings
         force_reindex: Whether to reindex even if document already exists
+        embed_batcher: Optional batcher that encodes chunks together with other documents'
+        doc_metadata: Document metadata already fetched (e.g. from a document list page);
+            fetched from Paperless when omitted
     
     Returns:
         Dictionary with ingestion results
@@ -178,8 +240,9 @@ async def ingest_document(
     logger.info(f"Starting ingestion of document {doc_id}")
     
     try:
-        # Get document metadata
-        doc_metadata = await get_document(doc_id)
+        # Get document metadata, unless the caller already has it from a list page
+        if doc_metadata is None:
+            doc_metadata = await get_document(doc_id)
         title = doc_metadata.get('title', f'Document {doc_id}')
         file_type = doc_metadata.get('file_type', 'unknown')
         tags = doc_metadata.get("tags", [])
@@ -203,13 +266,13 @@ async def ingest_document(
 
         # Check if document already exists (unless force reindex)
         if not force_reindex:
-            existing_chunks = qdrant_client.scroll(
+            existing_chunks, _ = await qdrant_client.scroll(
                 collection_name=COLLECTION_NAME,
                 scroll_filter=Filter(
                     must=[FieldCondition(key="doc_id", match=MatchValue(value=doc_id))]
                 ),
                 limit=1
-            )[0]
+            )
             
             if existing_chunks:
                 logger.info(f"Document {doc_id} already indexed, skipping")
@@ -221,14 +284,41 @@ async def ingest_document(
                     "reason": "already_exists"
                 }
         
-        # Download document content
-        doc_content = await download_document(doc_id)
         filename = doc_metadata.get('original_file_name', f'document_{doc_id}.pdf')  # Fixed: original_file_name not original_filename
         
-        # Extract text
-        extracted_pages = extract_text_from_file(filename, doc_content)
+        # Stream the download to a temporary file and extract from it memory-mapped,
+        # so the document body is never buffered in process memory
+        with tempfile.NamedTemporaryFile(suffix=os.path.splitext(filename)[1]) as tmp:
+            async for chunk in stream_document(doc_id):
+                tmp.write(chunk)
+            tmp.flush()
+            
+            # Extract text page by page and create chunks, so only one page's text is held at a time
+            all_chunks = []
+            pages_processed = 0
+            async for page_num, page_text in _iterate_in_thread(iter_text_from_path(tmp.name, filename)):
+                pages_processed += 1
+                if not page_text.strip():
+                    continue
+                
+                # Split page text into chunks using per-space params
+                text_chunks = chunk_text(page_text, chunk_tokens=effective_chunk_tokens, overlap_tokens=effective_chunk_overlap)
+
+                for text_chunk in text_chunks:
+                    chunk_metadata = {
+                        "text": text_chunk,
+                        "doc_id": doc_id,
+                        "title": title,
+                        "page": page_num,
+                        "file_type": file_type,
+                        "tags": tags,
+                        "space_ids": space_ids,
+                        "ingested_at": datetime.utcnow().isoformat(),
+                        "token_count": count_tokens(text_chunk)
+                    }
+                    all_chunks.append(chunk_metadata)
         
-        if not extracted_pages:
+        if not pages_processed:
             logger.warning(f"No text extracted from document {doc_id}")
             return {
                 "doc_id": doc_id,
@@ -238,29 +328,6 @@ async def ingest_document(
                 "reason": "no_text_extracted"
             }
         
-        # Process each page and create chunks
-        all_chunks = []
-        for page_num, page_text in extracted_pages:
-            if not page_text.strip():
-                continue
-            
-            # Split page text into chunks using per-space params
-            text_chunks = chunk_text(page_text, chunk_tokens=effective_chunk_tokens, overlap_tokens=effective_chunk_overlap)
-
-            for text_chunk in text_chunks:
-                chunk_metadata = {
-                    "text": text_chunk,
-                    "doc_id": doc_id,
-                    "title": title,
-                    "page": page_num,
-                    "file_type": file_type,
-                    "tags": tags,
-                    "space_ids": space_ids,
-                    "ingested_at": datetime.utcnow().isoformat(),
-                    "token_count": count_tokens(text_chunk)
-                }
-                all_chunks.append(chunk_metadata)
-        
         if not all_chunks:
             logger.warning(f"No chunks created from document {doc_id}")
             return {
@@ -274,7 +341,10 @@ async def ingest_document(
         # Generate embeddings
         logger.info(f"Generating embeddings for {len(all_chunks)} chunks")
         chunk_texts = [chunk["text"] for chunk in all_chunks]
-        embeddings = embedding_model.encode(chunk_texts, convert_to_tensor=False)
+        if embed_batcher is not None:
+            embeddings = await embed_batcher.encode_many(chunk_texts)
+        else:
+            embeddings = embedding_model.encode(chunk_texts, convert_to_tensor=False)
         
         # Convert to list of lists if needed
         if hasattr(embeddings, 'tolist'):
@@ -282,7 +352,7 @@ async def ingest_document(
         
         # Remove existing chunks for this document if reindexing
         if force_reindex:
-            qdrant_client.delete(
+            await qdrant_client.delete(
                 collection_name=COLLECTION_NAME,
                 points_selector=Filter(
                     must=[FieldCondition(key="doc_id", match=MatchValue(value=doc_id))]
@@ -290,7 +360,7 @@ async def ingest_document(
             )
         
         # Upsert chunks to Qdrant
-        upsert_chunks_to_qdrant(qdrant_client, all_chunks, embeddings)
+        await upsert_chunks_to_qdrant(qdrant_client, all_chunks, embeddings)
         
         logger.info(f"Successfully ingested document {doc_id} with {len(all_chunks)} chunks")
         
@@ -299,7 +369,8 @@ async def ingest_document(
             "title": title,
             "status": "success",
             "chunks_created": len(all_chunks),
-            "pages_processed": len(extracted_pages)
+            "pages_processed": pages_processed,
+            "space_ids": space_ids
         }
         
     except Exception as e:
@@ -313,7 +384,7 @@ async def ingest_document(
         }
 
 
-async def remove_document(doc_id: int, qdrant_client: QdrantClient) -> bool:
+async def remove_document(doc_id: int, qdrant_client: AsyncQdrantClient) -> bool:
     """
     Remove all chunks for a document from the vector database.
     
@@ -325,12 +396,13 @@ async def remove_document(doc_id: int, qdrant_client: QdrantClient) -> bool:
         True if successful, False otherwise
     """
     try:
-        result = qdrant_client.delete(
+        result = await qdrant_client.delete(
             collection_name=COLLECTION_NAME,
             points_selector=Filter(
                 must=[FieldCondition(key="doc_id", match=MatchValue(value=doc_id))]
             )
         )
+        invalidate_retrieval_cache()
         
         logger.info(f"Removed document {doc_id} from vector database")
         return True
@@ -340,7 +412,7 @@ async def remove_document(doc_id: int, qdrant_client: QdrantClient) -> bool:
         return False
 
 
-def get_collection_stats(qdrant_client: QdrantClient) -> Dict[str, Any]:
+async def get_collection_stats(qdrant_client: AsyncQdrantClient) -> Dict[str, Any]:
     """
     Get statistics about the vector database collection.
     
@@ -351,7 +423,7 @@ def get_collection_stats(qdrant_client: QdrantClient) -> Dict[str, Any]:
         Dictionary with collection statistics
     """
     try:
-        collection_info = qdrant_client.get_collection(COLLECTION_NAME)
+        collection_info = await qdrant_client.get_collection(COLLECTION_NAME)
         
         return {
             "collection_name": COLLECTION_NAME,
@@ -1,7 +1,7 @@
 """LLM integration with OpenRouter for generating answers."""
 
 import logging
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional
 import httpx
 import json
 from datetime import datetime
@@ -123,20 +123,8 @@ Please answer the question based on the provided context. When referencing infor
     return messages
 
 
-async def call_openrouter(messages: List[Dict[str, str]], model: Optional[str] = None) -> Dict[str, Any]:
-    """
-    Call OpenRouter API to generate a response.
-    
-    Args:
-        messages: List of conversation messages
-        model: Optional model override
-    
-    Returns:
-        Dictionary with response data
-    """
-    if model is None:
-        model = settings.OPENROUTER_MODEL
-    
+def _openrouter_request(messages: List[Dict[str, str]], model: str, stream: bool) -> tuple:
+    """Build the (headers, payload) pair for an OpenRouter chat completion."""
     headers = {
         "Authorization": f"Bearer {settings.OPENROUTER_API_KEY}",
         "Content-Type": "application/json",
@@ -150,8 +138,26 @@ async def call_openrouter(messages: List[Dict[str, str]], model: Optional[str] =
         "temperature": 0.2,
         "top_p": 0.9,
         "max_tokens": 1000,  # Reasonable limit for answers
-        "stream": False
+        "stream": stream
     }
+    return headers, payload
+
+
+async def call_openrouter(messages: List[Dict[str, str]], model: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Call OpenRouter API to generate a response.
+    
+    Args:
+        messages: List of conversation messages
+        model: Optional model override
+    
+    Returns:
+        Dictionary with response data
+    """
+    if model is None:
+        model = settings.OPENROUTER_MODEL
+    
+    headers, payload = _openrouter_request(messages, model, stream=False)
     
     try:
         async with httpx.AsyncClient(timeout=120) as client:
@@ -232,6 +238,72 @@ async def generate_answer(
     return result
 
 
+async def stream_openrouter(messages: List[Dict[str, str]], model: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Call OpenRouter API with streaming enabled.
+    
+    Args:
+        messages: List of conversation messages
+        model: Optional model override
+    
+    Yields:
+        Text deltas as the model generates them
+    """
+    if model is None:
+        model = settings.OPENROUTER_MODEL
+    
+    headers, payload = _openrouter_request(messages, model, stream=True)
+    
+    async with httpx.AsyncClient(timeout=120) as client:
+        async with client.stream(
+            "POST",
+            f"{settings.OPENROUTER_BASE_URL}/chat/completions",
+            json=payload,
+            headers=headers
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                # SSE: skip blank lines and ": keep-alive" comments
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                delta = choices[0].get("delta", {}).get("content") if choices else None
+                if delta:
+                    yield delta
+
+
+async def stream_answer(
+    query: str,
+    chunks: List[Dict[str, Any]],
+    model: Optional[str] = None,
+    history: Optional[List[Dict[str, str]]] = None,
+) -> AsyncIterator[str]:
+    """
+    Streaming counterpart of generate_answer.
+    
+    Args:
+        query: User's question
+        chunks: Relevant document chunks from vector search
+        model: Optional LLM model override
+        history: Optional recent chat history
+    
+    Yields:
+        Text deltas of the generated answer
+    """
+    if not chunks:
+        yield "I couldn't find any relevant information in the documents to answer your question."
+        return
+    
+    messages = build_context_prompt(query, chunks, history)
+    logger.info(f"Streaming answer for query: {query[:100]}...")
+    
+    async for delta in stream_openrouter(messages, model):
+        yield delta
+
+
 async def test_llm_connection(model: Optional[str] = None) -> bool:
     """
     Test connection to OpenRouter API.
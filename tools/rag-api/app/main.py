@@ -5,14 +5,23 @@ import logging
 import os
 import sys
 from contextlib import asynccontextmanager
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Set
 import asyncio
+import heapq
 
+import httpx
+import numpy as np
 from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
-from qdrant_client import QdrantClient
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.models import Filter, FieldCondition, MatchAny
 from sentence_transformers import SentenceTransformer
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder
+from starlette.types import Message, Receive, Scope, Send
 
 from . import __version__
 from .config import get_settings
@@ -22,11 +31,16 @@ from .models import (
 )
 from .paperless import (
     test_connection as test_paperless_connection, list_documents, list_all_documents,
-    get_document, build_document_url, get_space_field_id, get_document_spaces,
+    list_all_paged, get_document, build_document_url, get_space_field_id, get_document_spaces,
+    close_client as close_paperless_client,
 )
 from .retriever import search_similar_chunks, deduplicate_chunks
-from .llm import generate_answer, test_llm_connection
+from .llm import generate_answer, stream_answer, test_llm_connection
 from .ingest import ensure_collection, ingest_document, get_collection_stats
+from .extractors import shutdown_pdf_pool
+from .cache import IndexedDocIdsCache, get_indexed_ids_cache
+from .embed_batcher import EmbedBatcher
+from .query_cache import invalidate_retrieval_cache
 from .spaces_config import get_all_spaces_info, get_defined_spaces, get_space_params, load_spaces_config, save_spaces_config
 
 # Configure logging
@@ -45,11 +59,44 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Global variables for shared resources
-qdrant_client: Optional[QdrantClient] = None
+qdrant_client: Optional[AsyncQdrantClient] = None
 embedding_model: Optional[SentenceTransformer] = None
+embed_batcher: Optional[EmbedBatcher] = None
 settings = get_settings()
 
 
+def load_embedding_model() -> SentenceTransformer:
+    """Load the embedding model with the configured EMBEDDING_BACKEND.
+
+    "onnx" falls back to plain "torch" if the ONNX runtime or model file is
+    unavailable; int8 quantization only applies to Linear layers on CPU.
+    """
+    import torch
+
+    if settings.EMBEDDING_THREADS > 0:
+        torch.set_num_threads(settings.EMBEDDING_THREADS)
+
+    backend = settings.EMBEDDING_BACKEND
+    if backend == "onnx":
+        try:
+            return SentenceTransformer(
+                settings.EMBEDDING_MODEL,
+                backend="onnx",
+                model_kwargs={"file_name": settings.EMBEDDING_ONNX_FILE},
+            )
+        except Exception as e:
+            logger.warning(f"ONNX embedding model unavailable, falling back to torch: {e}")
+            backend = "torch"
+
+    model = SentenceTransformer(settings.EMBEDDING_MODEL)
+    if backend == "torch-int8":
+        if model.device.type == "cpu":
+            torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        else:
+            logger.info(f"Skipping int8 quantization on {model.device.type}")
+    return model
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown.
@@ -61,12 +108,14 @@ async def lifespan(app: FastAPI):
     """
     logger.info("Starting Paperless RAG API...")
 
-    global qdrant_client, embedding_model
+    global qdrant_client, embedding_model, embed_batcher
 
     # ── Hard requirement: embedding model (local, no network) ──
     try:
-        logger.info(f"Loading embedding model: {settings.EMBEDDING_MODEL}")
-        embedding_model = SentenceTransformer(settings.EMBEDDING_MODEL)
+        logger.info(f"Loading embedding model: {settings.EMBEDDING_MODEL} ({settings.EMBEDDING_BACKEND})")
+        embedding_model = load_embedding_model()
+        # Ingests share one batcher so concurrent documents are embedded together
+        embed_batcher = EmbedBatcher(embedding_model)
     except Exception as e:
         logger.error(f"Failed to load embedding model — cannot start: {e}")
         raise
@@ -74,9 +123,9 @@ async def lifespan(app: FastAPI):
     # ── Best-effort: Qdrant ──
     try:
         logger.info(f"Connecting to Qdrant at {settings.QDRANT_URL}")
-        qdrant_client = QdrantClient(url=settings.QDRANT_URL, timeout=5)
+        qdrant_client = AsyncQdrantClient(url=settings.QDRANT_URL, timeout=5)
         embedding_dim = embedding_model.get_sentence_embedding_dimension()
-        ensure_collection(qdrant_client, embedding_dim)
+        await ensure_collection(qdrant_client, embedding_dim)
     except Exception as e:
         logger.warning(f"Qdrant unavailable at startup — will retry on first request: {e}")
         qdrant_client = None
@@ -101,6 +150,11 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down...")
+    await embed_batcher.aclose()
+    if qdrant_client is not None:
+        await qdrant_client.close()
+    await close_paperless_client()
+    shutdown_pdf_pool()
 
 
 # Create FastAPI app
@@ -108,18 +162,25 @@ app = FastAPI(
     title="Paperless RAG Q&A API",
     description="A RAG system for Q&A over documents stored in paperless-ngx",
     version=__version__,
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson serializes the large list payloads (/check-new, /documents, /stats) several times faster
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS - MUST be added immediately after app creation
-# Ensure ALLOWED_ORIGINS is a list
-cors_origins = settings.ALLOWED_ORIGINS
-if isinstance(cors_origins, str):
-    cors_origins = [origin.strip() for origin in cors_origins.split(',')]
+@lru_cache(maxsize=1)
+def get_cors_origins() -> tuple:
+    """Parse ALLOWED_ORIGINS once into a tuple of origins."""
+    # Ensure ALLOWED_ORIGINS is a list
+    cors_origins = settings.ALLOWED_ORIGINS
+    if isinstance(cors_origins, str):
+        cors_origins = [origin.strip() for origin in cors_origins.split(',')]
+
+    # For development, allow all origins if "*" is in the list
+    if "*" in cors_origins:
+        return ("*",)
+    return tuple(cors_origins)
 
-# For development, allow all origins if "*" is in the list
-if "*" in cors_origins:
-    cors_origins = ["*"]
 
 # Add CORS middleware with explicit configuration
 from starlette.middleware.cors import CORSMiddleware as StarletteCORS
@@ -136,18 +197,60 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+class _EventStreamGZipResponder(GZipResponder):
+    """GZipResponder that sends text/event-stream responses uncompressed.
+
+    The compressor would hold events back until enough output accumulated.
+    """
+
+    passthrough = False
+
+    async def send_with_gzip(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            self.passthrough = content_type.startswith("text/event-stream")
+        if self.passthrough:
+            await self.send(message)
+        else:
+            await super().send_with_gzip(message)
+
+
+class _GZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves Server-Sent Events streams alone."""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = _EventStreamGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+# Compress large JSON bodies (/check-new, /documents, ...); small responses and
+# event streams go out as-is
+app.add_middleware(_GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Headers for Server-Sent Events
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
 
-# Dependency to get Qdrant client
-def get_qdrant_client() -> QdrantClient:
+
+# Dependency to get Qdrant client (async so FastAPI doesn't hop to the threadpool per request)
+async def get_qdrant_client() -> AsyncQdrantClient:
     """Get Qdrant client dependency. Retries connection if it failed at startup."""
     global qdrant_client
     if qdrant_client is None:
         # Lazy reconnect — Qdrant was unavailable at startup
         try:
             logger.info(f"Retrying Qdrant connection at {settings.QDRANT_URL}")
-            qdrant_client = QdrantClient(url=settings.QDRANT_URL, timeout=5)
+            client = AsyncQdrantClient(url=settings.QDRANT_URL, timeout=5)
             embedding_dim = embedding_model.get_sentence_embedding_dimension()
-            ensure_collection(qdrant_client, embedding_dim)
+            await ensure_collection(client, embedding_dim)
+            # Publish only once ready, so concurrent requests never see a half-initialized client
+            qdrant_client = client
             logger.info("Qdrant reconnected successfully")
         except Exception as e:
             logger.warning(f"Qdrant still unavailable: {e}")
@@ -160,54 +263,110 @@ def get_qdrant_client() -> QdrantClient:
 
 
 # Dependency to get embedding model
-def get_embedding_model() -> SentenceTransformer:
+async def get_embedding_model() -> SentenceTransformer:
     """Get embedding model dependency."""
     if embedding_model is None:
         raise HTTPException(status_code=500, detail="Embedding model not initialized")
     return embedding_model
 
 
+async def _encode_probe(embedder: SentenceTransformer):
+    """Run a one-sentence encode off the event loop to check the model works."""
+    return await asyncio.to_thread(embedder.encode, ["test"])
+
+
+async def _get_indexed_doc_ids(qdrant: AsyncQdrantClient, space_id: Optional[str] = None) -> Set[int]:
+    """Distinct doc_ids in the collection, optionally limited to one space.
+
+    Served by Qdrant's facet API from the doc_id payload index, so the cost
+    scales with the number of documents rather than chunks. Servers without
+    facet support fall back to scrolling just the doc_id field.
+    """
+    space_filter = None
+    if space_id:
+        space_filter = Filter(must=[FieldCondition(key="space_ids", match=MatchAny(any=[space_id]))])
+
+    try:
+        res = await qdrant.facet(
+            collection_name=settings.COLLECTION_NAME,
+            key="doc_id",
+            facet_filter=space_filter,
+            limit=10_000_000,
+        )
+        return {hit.value for hit in res.hits}
+    except Exception as e:
+        logger.warning(f"Facet on doc_id unavailable, scrolling instead: {e}")
+
+    indexed_doc_ids = set()
+    offset = None
+    while True:
+        points, offset = await qdrant.scroll(
+            collection_name=settings.COLLECTION_NAME,
+            limit=10000,
+            offset=offset,
+            scroll_filter=space_filter,
+            with_payload=["doc_id"],
+            with_vectors=False,
+        )
+        for point in points:
+            doc_id = point.payload.get("doc_id")
+            if doc_id:
+                indexed_doc_ids.add(doc_id)
+        if offset is None:
+            return indexed_doc_ids
+
+
+def _id_array(ids) -> np.ndarray:
+    """Pack document IDs into an int64 array (8 bytes per ID instead of a boxed int)."""
+    return np.fromiter(ids, dtype=np.int64, count=len(ids))
+
+
+def _requested_doc_ids(request: Optional[dict]) -> Optional[set]:
+    """Return the request's doc_ids as a set, or None if it names none.
+
+    Only real integers are accepted: _id_array would otherwise turn "12"
+    into 12 and 1.5 into 1 instead of rejecting them.
+    """
+    if not request or "doc_ids" not in request:
+        return None
+    doc_ids = request["doc_ids"]
+    if not isinstance(doc_ids, list) or not all(
+        isinstance(doc_id, int) and not isinstance(doc_id, bool) for doc_id in doc_ids
+    ):
+        raise HTTPException(status_code=422, detail="doc_ids must be a list of integers")
+    return set(doc_ids)
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint. Does NOT depend on Qdrant being available."""
-    components = {
-        "qdrant": "unknown",
-        "embedding_model": "unknown",
-        "paperless": "unknown",
-        "llm": "unknown"
-    }
 
-    # Test Qdrant (use global directly — don't go through dependency)
-    try:
-        client = get_qdrant_client()
-        client.get_collections()
-        components["qdrant"] = "healthy"
-    except Exception as e:
-        components["qdrant"] = f"error: {str(e)[:100]}"
+    # The probes are independent, so run them concurrently; each reports "healthy" or raises
+    async def _qdrant_probe() -> str:
+        client = await get_qdrant_client()
+        await client.get_collections()
+        return "healthy"
 
-    # Test embedding model
-    try:
-        if embedding_model:
-            embedding_model.encode(["test"])
-            components["embedding_model"] = "healthy"
-        else:
-            components["embedding_model"] = "error: not loaded"
-    except Exception as e:
-        components["embedding_model"] = f"error: {str(e)[:100]}"
+    async def _embed_probe() -> str:
+        if not embedding_model:
+            return "error: not loaded"
+        await _encode_probe(embedding_model)
+        return "healthy"
 
-    # Test paperless connection
-    try:
-        paperless_healthy = await test_paperless_connection()
-        components["paperless"] = "healthy" if paperless_healthy else "error"
-    except Exception as e:
-        components["paperless"] = f"error: {str(e)[:100]}"
+    async def _paperless_probe() -> str:
+        return "healthy" if await test_paperless_connection() else "error"
 
-    # Test LLM connection
-    try:
-        llm_healthy = await test_llm_connection()
-        components["llm"] = "healthy" if llm_healthy else "error"
-    except Exception as e:
-        components["llm"] = f"error: {str(e)[:100]}"
+    async def _llm_probe() -> str:
+        return "healthy" if await test_llm_connection() else "error"
+
+    results = await asyncio.gather(
+        _qdrant_probe(), _embed_probe(), _paperless_probe(), _llm_probe(),
+        return_exceptions=True
+    )
+    components = {
+        name: f"error: {str(result)[:100]}" if isinstance(result, Exception) else result
+        for name, result in zip(("qdrant", "embedding_model", "paperless", "llm"), results)
+    }
 
     # Determine overall status
     overall_status = "healthy" if all(
@@ -221,10 +380,48 @@ async def health_check():
     )
 
 
+def _build_citations(chunks: List[dict]) -> List[Citation]:
+    """Build the citation list returned alongside an answer."""
+    return [
+        Citation(
+            doc_id=chunk["doc_id"],
+            title=chunk["title"],
+            page=chunk.get("page"),
+            score=chunk["score"],
+            url=build_document_url(chunk["doc_id"]),
+            snippet=chunk["text"][:300] + "..." if len(chunk["text"]) > 300 else chunk["text"]
+        )
+        for chunk in chunks
+    ]
+
+
+def _ask_event_stream(request: AskRequest, chunks: List[dict]) -> StreamingResponse:
+    """Stream an /ask answer as SSE: a {"delta"} event per token, then {"citations", "done"}."""
+
+    async def event_generator():
+        try:
+            async for delta in stream_answer(request.query, chunks, history=request.history):
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming answer: {e}")
+            yield f"data: {json.dumps({'error': str(e), 'done': True})}\n\n"
+            return
+
+        citations = [citation.model_dump() for citation in _build_citations(chunks)]
+        logger.info(f"Streamed answer with {len(citations)} citations")
+        yield f"data: {json.dumps({'citations': citations, 'model_used': settings.OPENROUTER_MODEL, 'done': True})}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
 @app.post("/ask", response_model=AskResponse)
 async def ask_question(
     request: AskRequest,
-    qdrant: QdrantClient = Depends(get_qdrant_client),
+    qdrant: AsyncQdrantClient = Depends(get_qdrant_client),
     embedder: SentenceTransformer = Depends(get_embedding_model)
 ):
     """Ask a question about the documents."""
@@ -236,7 +433,7 @@ async def ask_question(
         top_k = request.top_k or space_params.top_k
         # Double the search results to ensure we get comprehensive coverage
         search_k = top_k * 2 if top_k < 20 else top_k
-        chunks = search_similar_chunks(
+        chunks = await search_similar_chunks(
             qdrant_client=qdrant,
             embedding_model=embedder,
             query=request.query,
@@ -248,6 +445,8 @@ async def ask_question(
         # If no chunks found and general chat is allowed, fall back to non-RAG response
         if not chunks and request.allow_general_chat:
             logger.info("No RAG context found; falling back to general chat mode")
+            if request.stream:
+                return _ask_event_stream(request, [])
             llm_result = await generate_answer(request.query, [], history=request.history)
             return AskResponse(
                 answer=llm_result["answer"],
@@ -257,6 +456,8 @@ async def ask_question(
             )
         elif not chunks:
             logger.warning("No relevant chunks found for query")
+            if request.stream:
+                return _ask_event_stream(request, [])
             return AskResponse(
                 answer="I couldn't find any relevant information in the documents to answer your question.",
                 citations=[],
@@ -267,21 +468,15 @@ async def ask_question(
         # Deduplicate similar chunks
         chunks = deduplicate_chunks(chunks)
         
+        # Streaming clients get tokens as they arrive
+        if request.stream:
+            return _ask_event_stream(request, chunks)
+        
         # Generate answer using LLM
         llm_result = await generate_answer(request.query, chunks, history=request.history)
         
         # Build citations
-        citations = []
-        for chunk in chunks:
-            citation = Citation(
-                doc_id=chunk["doc_id"],
-                title=chunk["title"],
-                page=chunk.get("page"),
-                score=chunk["score"],
-                url=build_document_url(chunk["doc_id"]),
-                snippet=chunk["text"][:300] + "..." if len(chunk["text"]) > 300 else chunk["text"]
-            )
-            citations.append(citation)
+        citations = _build_citations(chunks)
         
         logger.info(f"Generated answer with {len(citations)} citations")
         
@@ -301,8 +496,9 @@ async def ask_question(
 async def ingest_documents(
     request: IngestRequest,
     background_tasks: BackgroundTasks,
-    qdrant: QdrantClient = Depends(get_qdrant_client),
-    embedder: SentenceTransformer = Depends(get_embedding_model)
+    qdrant: AsyncQdrantClient = Depends(get_qdrant_client),
+    embedder: SentenceTransformer = Depends(get_embedding_model),
+    cache: IndexedDocIdsCache = Depends(get_indexed_ids_cache),
 ):
     """Ingest documents into the vector database."""
     logger.info(f"Ingest request: doc_id={request.doc_id}, force_reindex={request.force_reindex}")
@@ -314,10 +510,12 @@ async def ingest_documents(
                 doc_id=request.doc_id,
                 qdrant_client=qdrant,
                 embedding_model=embedder,
-                force_reindex=request.force_reindex
+                force_reindex=request.force_reindex,
+                embed_batcher=embed_batcher
             )
             
             if result["status"] == "success":
+                cache.add(request.doc_id, result["space_ids"])
                 return IngestResponse(
                     message=f"Successfully ingested document {request.doc_id}",
                     documents_processed=1,
@@ -350,7 +548,7 @@ async def ingest_documents(
 
 
 async def ingest_all_documents_background(
-    qdrant: QdrantClient,
+    qdrant: AsyncQdrantClient,
     embedder: SentenceTransformer,
     force_reindex: bool = False,
     updated_after: Optional[str] = None
@@ -365,18 +563,28 @@ async def ingest_all_documents_background(
         total_docs = len(documents)
         processed = 0
         total_chunks = 0
+        cache = get_indexed_ids_cache()
         
-        for doc in documents:
+        # Overlap one document's Paperless I/O with another's embedding work
+        sem = asyncio.Semaphore(settings.INGEST_CONCURRENCY)
+        
+        async def _one(doc: dict):
+            nonlocal processed, total_chunks
             doc_id = doc["id"]
             try:
-                result = await ingest_document(
-                    doc_id=doc_id,
-                    qdrant_client=qdrant,
-                    embedding_model=embedder,
-                    force_reindex=force_reindex
-                )
+                async with sem:
+                    # The list payload carries the full metadata, so skip the per-document fetch
+                    result = await ingest_document(
+                        doc_id=doc_id,
+                        qdrant_client=qdrant,
+                        embedding_model=embedder,
+                        force_reindex=force_reindex,
+                        embed_batcher=embed_batcher,
+                        doc_metadata=doc
+                    )
                 
                 if result["status"] == "success":
+                    cache.add(doc_id, result["space_ids"])
                     processed += 1
                     total_chunks += result["chunks_created"]
                     logger.info(f"Ingested document {doc_id} ({processed}/{total_docs})")
@@ -385,7 +593,8 @@ async def ingest_all_documents_background(
                 
             except Exception as e:
                 logger.error(f"Failed to ingest document {doc_id}: {e}")
-                continue
+        
+        await asyncio.gather(*[_one(doc) for doc in documents])
         
         logger.info(f"Background ingestion complete: {processed}/{total_docs} documents, {total_chunks} chunks")
         
@@ -396,8 +605,9 @@ async def ingest_all_documents_background(
 @app.get("/check-new")
 async def check_new_documents(
     space_id: Optional[str] = None,
-    qdrant: QdrantClient = Depends(get_qdrant_client),
+    qdrant: AsyncQdrantClient = Depends(get_qdrant_client),
     embedder: SentenceTransformer = Depends(get_embedding_model),
+    cache: IndexedDocIdsCache = Depends(get_indexed_ids_cache),
 ):
     """Check for new documents WITHOUT indexing them. Also checks if LLM/embedding model is available."""
     logger.info(f"Checking for new documents (no indexing, space_id={space_id})")
@@ -412,7 +622,7 @@ async def check_new_documents(
         logger.warning(f"LLM not available: {e}")
     
     try:
-        embedder.encode(["test"])
+        await _encode_probe(embedder)
         embedding_available = True
     except Exception as e:
         logger.warning(f"Embedding model not available: {e}")
@@ -424,9 +634,8 @@ async def check_new_documents(
         )
     
     try:
-        # Get all documents from Paperless (use large page_size to get all)
-        docs_response = await list_documents(page_size=10000)
-        paperless_docs = docs_response.get("results", [])
+        # Get all documents from Paperless (pages fetched in parallel)
+        paperless_docs = await list_all_paged()
 
         # Create lookup dict for doc details
         paperless_docs_dict = {doc["id"]: doc for doc in paperless_docs}
@@ -434,7 +643,7 @@ async def check_new_documents(
         # Only documents with a valid space assignment are RAG-eligible.
         # Documents without a space are counted but excluded from sync.
         unassigned_count = 0
-        paperless_doc_ids = set()
+        paperless_doc_ids = []
         for doc in paperless_docs:
             slugs = get_document_spaces(doc)
             if not slugs:
@@ -442,49 +651,21 @@ async def check_new_documents(
                 continue
             if space_id and space_id not in slugs:
                 continue
-            paperless_doc_ids.add(doc["id"])
+            paperless_doc_ids.append(doc["id"])
 
         logger.info(f"Found {len(paperless_doc_ids)} documents in Paperless (space_id={space_id})")
 
         # Get indexed document IDs from Qdrant (optionally filtered by space)
-        from qdrant_client.http.models import Filter, FieldCondition, MatchAny
-        indexed_doc_ids = set()
-        offset = None
-        scroll_filter = None
-        if space_id:
-            scroll_filter = Filter(
-                must=[FieldCondition(key="space_ids", match=MatchAny(any=[space_id]))]
-            )
-
-        while True:
-            result = qdrant.scroll(
-                collection_name=settings.COLLECTION_NAME,
-                limit=100,
-                offset=offset,
-                scroll_filter=scroll_filter,
-                with_payload=True,
-                with_vectors=False
-            )
-
-            points, next_offset = result
-
-            for point in points:
-                doc_id = point.payload.get("doc_id")
-                if doc_id:
-                    indexed_doc_ids.add(doc_id)
-
-            if next_offset is None:
-                break
-            offset = next_offset
+        indexed_doc_ids = await cache.get(space_id, lambda: _get_indexed_doc_ids(qdrant, space_id))
 
         logger.info(f"Found {len(indexed_doc_ids)} documents already indexed in RAG")
 
-        # Find new documents
-        new_doc_ids = paperless_doc_ids - indexed_doc_ids
+        # Find new documents (setdiff1d returns them sorted)
+        new_doc_ids = np.setdiff1d(_id_array(paperless_doc_ids), _id_array(indexed_doc_ids)).tolist()
 
         # Build detailed list with titles
         new_documents = []
-        for doc_id in sorted(new_doc_ids):
+        for doc_id in new_doc_ids:
             doc_info = paperless_docs_dict.get(doc_id, {})
             new_documents.append({
                 "id": doc_id,
@@ -513,8 +694,9 @@ async def check_new_documents(
 @app.post("/sync")
 async def sync_new_documents(
     request: dict = None,
-    qdrant: QdrantClient = Depends(get_qdrant_client),
+    qdrant: AsyncQdrantClient = Depends(get_qdrant_client),
     embedder: SentenceTransformer = Depends(get_embedding_model),
+    cache: IndexedDocIdsCache = Depends(get_indexed_ids_cache),
 ):
     """Index documents. Can index all new documents or only specific doc_ids.
 
@@ -526,12 +708,13 @@ async def sync_new_documents(
 
     If doc_ids is not provided, indexes ALL new documents (optionally filtered by space).
     """
+    requested_doc_ids = _requested_doc_ids(request)
     sync_space_id = (request or {}).get("space_id")
     logger.info(f"Starting sync (space_id={sync_space_id})")
     
     # Check if embedding model is available
     try:
-        embedder.encode(["test"])
+        await _encode_probe(embedder)
     except Exception as e:
         raise HTTPException(
             status_code=503,
@@ -539,77 +722,51 @@ async def sync_new_documents(
         )
     
     try:
-        # Get specific doc_ids from request if provided
-        requested_doc_ids = None
-        if request and "doc_ids" in request:
-            requested_doc_ids = set(request["doc_ids"])
+        if requested_doc_ids is not None:
             logger.info(f"Syncing specific documents: {requested_doc_ids}")
 
-        # Get all documents from Paperless (use large page_size to get all)
-        docs_response = await list_documents(page_size=10000)
-        paperless_docs = docs_response.get("results", [])
-        paperless_doc_ids = {doc["id"] for doc in paperless_docs}
+        # Get all documents from Paperless (pages fetched in parallel)
+        paperless_docs = await list_all_paged()
+        paperless_docs_dict = {doc["id"]: doc for doc in paperless_docs}
 
         # Filter by space if requested
         if sync_space_id:
-            space_doc_ids = set()
-            for doc in paperless_docs:
-                slugs = get_document_spaces(doc)
-                if sync_space_id in slugs:
-                    space_doc_ids.add(doc["id"])
-            paperless_doc_ids = space_doc_ids
+            paperless_doc_ids = _id_array(
+                [doc["id"] for doc in paperless_docs if sync_space_id in get_document_spaces(doc)]
+            )
+        else:
+            paperless_doc_ids = np.fromiter(
+                (doc["id"] for doc in paperless_docs), dtype=np.int64, count=len(paperless_docs)
+            )
 
         logger.info(f"Found {len(paperless_doc_ids)} documents in Paperless (space_id={sync_space_id})")
 
         # Get indexed document IDs from Qdrant (optionally filtered by space)
-        from qdrant_client.http.models import Filter as QFilter, FieldCondition as QFC, MatchAny as QMA
-        indexed_doc_ids = set()
-        offset = None
-        scroll_filter = None
-        if sync_space_id:
-            scroll_filter = QFilter(must=[QFC(key="space_ids", match=QMA(any=[sync_space_id]))])
-
-        while True:
-            result = qdrant.scroll(
-                collection_name=settings.COLLECTION_NAME,
-                limit=100,
-                offset=offset,
-                scroll_filter=scroll_filter,
-                with_payload=True,
-                with_vectors=False
-            )
-
-            points, next_offset = result
-
-            for point in points:
-                doc_id = point.payload.get("doc_id")
-                if doc_id:
-                    indexed_doc_ids.add(doc_id)
-
-            if next_offset is None:
-                break
-            offset = next_offset
+        indexed_doc_ids = _id_array(
+            await cache.get(sync_space_id, lambda: _get_indexed_doc_ids(qdrant, sync_space_id))
+        )
 
         logger.info(f"Found {len(indexed_doc_ids)} documents already indexed in RAG")
         
         # Determine which documents to index
         if requested_doc_ids:
             # User specified specific docs - validate they exist and aren't indexed
-            docs_to_index = requested_doc_ids & paperless_doc_ids  # Must exist in Paperless
-            docs_to_index = docs_to_index - indexed_doc_ids  # Not already indexed
+            requested_arr = _id_array(requested_doc_ids)
+            docs_to_index = np.intersect1d(requested_arr, paperless_doc_ids)  # Must exist in Paperless
+            docs_to_index = np.setdiff1d(docs_to_index, indexed_doc_ids)  # Not already indexed
             
-            invalid_ids = requested_doc_ids - paperless_doc_ids
-            already_indexed = requested_doc_ids & indexed_doc_ids
+            invalid_ids = np.setdiff1d(requested_arr, paperless_doc_ids)
+            already_indexed = np.intersect1d(requested_arr, indexed_doc_ids)
             
-            if invalid_ids:
-                logger.warning(f"Requested doc_ids not in Paperless: {invalid_ids}")
-            if already_indexed:
-                logger.info(f"Requested doc_ids already indexed: {already_indexed}")
+            if invalid_ids.size:
+                logger.warning(f"Requested doc_ids not in Paperless: {invalid_ids.tolist()}")
+            if already_indexed.size:
+                logger.info(f"Requested doc_ids already indexed: {already_indexed.tolist()}")
         else:
             # No specific docs requested - index ALL new documents
-            docs_to_index = paperless_doc_ids - indexed_doc_ids
+            docs_to_index = np.setdiff1d(paperless_doc_ids, indexed_doc_ids)
         
-        if not docs_to_index:
+        if not docs_to_index.size:
             return {
                 "message": "No documents to index",
                 "new_documents": [],
@@ -620,32 +777,39 @@ async def sync_new_documents(
         
         logger.info(f"Indexing {len(docs_to_index)} documents")
         
-        # Index documents
+        # Index documents, a bounded number at a time
         indexed_docs = []
         failed_docs = []
         total_chunks = 0
+        sem = asyncio.Semaphore(settings.INGEST_CONCURRENCY)
         
-        for doc_id in sorted(docs_to_index):
-            try:
-                result = await ingest_document(
+        async def _one(doc_id: int):
+            async with sem:
+                return await ingest_document(
                     doc_id=doc_id,
                     qdrant_client=qdrant,
                     embedding_model=embedder,
-                    force_reindex=False
+                    force_reindex=False,
+                    embed_batcher=embed_batcher,
+                    doc_metadata=paperless_docs_dict.get(doc_id)
                 )
-                
-                if result["status"] == "success":
-                    indexed_docs.append(doc_id)
-                    total_chunks += result["chunks_created"]
-                    logger.info(f"✓ Indexed document {doc_id}")
-                else:
-                    failed_docs.append(doc_id)
-                    logger.warning(f"✗ Skipped document {doc_id}: {result.get('reason')}")
-                    
-            except Exception as e:
+        
+        # setdiff1d/intersect1d already hand back sorted, unique IDs
+        doc_ids = docs_to_index.tolist()
+        results = await asyncio.gather(*[_one(doc_id) for doc_id in doc_ids], return_exceptions=True)
+        
+        for doc_id, result in zip(doc_ids, results):
+            if isinstance(result, Exception):
                 failed_docs.append(doc_id)
-                logger.error(f"Failed to index document {doc_id}: {e}")
-                continue
+                logger.error(f"Failed to index document {doc_id}: {result}")
+            elif result["status"] == "success":
+                cache.add(doc_id, result["space_ids"])
+                indexed_docs.append(doc_id)
+                total_chunks += result["chunks_created"]
+                logger.info(f"✓ Indexed document {doc_id}")
+            else:
+                failed_docs.append(doc_id)
+                logger.warning(f"✗ Skipped document {doc_id}: {result.get('reason')}")
         
         return {
             "message": f"Sync complete: {len(indexed_docs)} documents indexed",
@@ -664,8 +828,9 @@ async def sync_new_documents(
 @app.post("/sync-stream")
 async def sync_stream(
     request: dict = None,
-    qdrant: QdrantClient = Depends(get_qdrant_client),
+    qdrant: AsyncQdrantClient = Depends(get_qdrant_client),
     embedder: SentenceTransformer = Depends(get_embedding_model),
+    cache: IndexedDocIdsCache = Depends(get_indexed_ids_cache),
 ):
     """Stream-based sync: indexes documents and yields SSE events for each.
 
@@ -680,9 +845,11 @@ async def sync_stream(
       { "doc_ids": [...], "space_id": "slug" }
     """
 
+    requested_doc_ids = _requested_doc_ids(request)
+
     # --- Validate embedding model upfront (before streaming) ----------------
     try:
-        embedder.encode(["test"])
+        await _encode_probe(embedder)
     except Exception as e:
         raise HTTPException(
             status_code=503,
@@ -694,12 +861,7 @@ async def sync_stream(
     logger.info(f"Starting sync-stream (space_id={sync_space_id})")
 
     try:
-        requested_doc_ids = None
-        if request and "doc_ids" in request:
-            requested_doc_ids = set(request["doc_ids"])
-
-        docs_response = await list_documents(page_size=10000)
-        paperless_docs = docs_response.get("results", [])
+        paperless_docs = await list_all_paged()
 
         # Build id → metadata lookup for title / spaces
         # Only include docs that have at least one valid space assignment
@@ -715,34 +877,12 @@ async def sync_stream(
             doc_lookup[doc["id"]] = {
                 "title": doc.get("title", f"Document {doc['id']}"),
                 "spaces": slugs,
+                "doc": doc,
             }
             paperless_doc_ids.add(doc["id"])
 
         # Get already-indexed doc IDs from Qdrant
-        from qdrant_client.http.models import Filter as QFilter, FieldCondition as QFC, MatchAny as QMA
-        indexed_doc_ids = set()
-        offset = None
-        scroll_filter = None
-        if sync_space_id:
-            scroll_filter = QFilter(must=[QFC(key="space_ids", match=QMA(any=[sync_space_id]))])
-
-        while True:
-            result = qdrant.scroll(
-                collection_name=settings.COLLECTION_NAME,
-                limit=100,
-                offset=offset,
-                scroll_filter=scroll_filter,
-                with_payload=True,
-                with_vectors=False,
-            )
-            points, next_offset = result
-            for point in points:
-                doc_id = point.payload.get("doc_id")
-                if doc_id:
-                    indexed_doc_ids.add(doc_id)
-            if next_offset is None:
-                break
-            offset = next_offset
+        indexed_doc_ids = await cache.get(sync_space_id, lambda: _get_indexed_doc_ids(qdrant, sync_space_id))
 
         # Determine docs to index
         if requested_doc_ids:
@@ -807,9 +947,12 @@ async def sync_stream(
                     qdrant_client=qdrant,
                     embedding_model=embedder,
                     force_reindex=False,
+                    embed_batcher=embed_batcher,
+                    doc_metadata=meta.get("doc"),
                 )
 
                 if result["status"] == "success":
+                    cache.add(doc_id, result["space_ids"])
                     indexed_docs.append(doc_id)
                     chunks = result["chunks_created"]
                     total_chunks += chunks
@@ -858,11 +1001,7 @@ async def sync_stream(
     return StreamingResponse(
         event_generator(),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
+        headers=SSE_HEADERS,
     )
 
 
@@ -873,27 +1012,26 @@ async def search_documents(
 ):
     """Search for documents by title."""
     try:
-        docs_response = await list_documents()
+        # Paperless filters by title server-side
+        docs_response = await list_documents(title_contains=q)
         documents = docs_response.get("results", [])
         
-        # Simple title search
+        # Rank by relevance (prefix match first), lowering each title once
+        # and keeping only the top `limit` instead of sorting every match
         query_lower = q.lower()
-        matching_docs = []
+        ranked = []
         for doc in documents:
-            if query_lower in doc.get("title", "").lower():
-                matching_docs.append({
-                    "id": doc["id"],
-                    "title": doc["title"],
-                    "url": build_document_url(doc["id"])
-                })
-        
-        # Sort by relevance (exact match first)
-        matching_docs.sort(key=lambda x: (
-            not x["title"].lower().startswith(query_lower),
-            x["title"].lower()
-        ))
+            title_lower = doc["title"].lower()
+            ranked.append((not title_lower.startswith(query_lower), title_lower, doc["id"], doc["title"]))
         
-        return matching_docs[:limit]
+        return [
+            {
+                "id": doc_id,
+                "title": title,
+                "url": build_document_url(doc_id)
+            }
+            for _, _, doc_id, title in heapq.nsmallest(limit, ranked)
+        ]
         
     except Exception as e:
         logger.error(f"Error searching documents: {e}")
@@ -905,17 +1043,31 @@ async def list_paperless_documents(
     offset: int = 0
 ):
     """List documents from paperless-ngx."""
+    if limit <= 0:
+        return []
+    
     try:
-        docs_response = await list_documents()
-        documents = docs_response.get("results", [])
+        # Let Paperless paginate; an unaligned offset needs the tail of one page and the head of the next
+        page, skip = divmod(offset, limit)
+        documents = []
+        for page_number in range(page + 1, page + (3 if skip else 2)):
+            try:
+                docs_response = await list_documents(page=page_number, page_size=limit)
+            except httpx.HTTPStatusError as e:
+                # Paperless answers 404 for pages past the end
+                if e.response.status_code == 404:
+                    break
+                raise
+            documents.extend(docs_response.get("results", []))
+            if not docs_response.get("next"):
+                break
         
-        # Apply pagination
-        paginated_docs = documents[offset:offset + limit]
+        paginated_docs = documents[skip:skip + limit]
         
-        # Convert to our model
-        doc_infos = []
-        for doc in paginated_docs:
-            doc_info = DocumentInfo(
+        # Convert to our model. Paperless already guarantees the field types,
+        # so skip per-document validation (response_model still checks the output)
+        return [
+            DocumentInfo.model_construct(
                 id=doc["id"],
                 title=doc["title"],
                 created=doc["created"],
@@ -924,9 +1076,8 @@ async def list_paperless_documents(
                 page_count=doc.get("page_count"),
                 tags=[tag["name"] for tag in doc.get("tags", [])]
             )
-            doc_infos.append(doc_info)
-        
-        return doc_infos
+            for doc in paginated_docs
+        ]
         
     except Exception as e:
         logger.error(f"Error listing documents: {e}")
@@ -956,8 +1107,9 @@ async def get_document_info(doc_id: int):
 
 @app.post("/reset-collection")
 async def reset_collection(
-    qdrant: QdrantClient = Depends(get_qdrant_client),
-    embedder: SentenceTransformer = Depends(get_embedding_model)
+    qdrant: AsyncQdrantClient = Depends(get_qdrant_client),
+    embedder: SentenceTransformer = Depends(get_embedding_model),
+    cache: IndexedDocIdsCache = Depends(get_indexed_ids_cache),
 ):
     """Reset the RAG collection by deleting and recreating it. This will remove all indexed documents."""
     logger.warning("Resetting RAG collection - all indexed documents will be deleted")
@@ -965,14 +1117,16 @@ async def reset_collection(
     try:
         # Delete the collection
         try:
-            qdrant.delete_collection(collection_name=settings.COLLECTION_NAME)
+            await qdrant.delete_collection(collection_name=settings.COLLECTION_NAME)
             logger.info(f"Deleted collection '{settings.COLLECTION_NAME}'")
         except Exception as e:
             logger.warning(f"Collection deletion warning (might not exist): {e}")
+        cache.clear()
+        invalidate_retrieval_cache()
         
         # Recreate the collection
         embedding_dim = embedder.get_sentence_embedding_dimension()
-        ensure_collection(qdrant, embedding_dim)
+        await ensure_collection(qdrant, embedding_dim)
         logger.info(f"Recreated collection '{settings.COLLECTION_NAME}'")
         
         return {
@@ -989,12 +1143,12 @@ async def reset_collection(
 @app.get("/stats")
 async def get_statistics(
     space_id: Optional[str] = None,
-    qdrant: QdrantClient = Depends(get_qdrant_client),
+    qdrant: AsyncQdrantClient = Depends(get_qdrant_client),
 ):
     """Get system statistics, optionally filtered by space."""
     try:
         # Get collection stats
-        collection_stats = get_collection_stats(qdrant)
+        collection_stats = await get_collection_stats(qdrant)
 
         # Get paperless document count
         try:
@@ -1020,7 +1174,7 @@ async def get_statistics(
             total_space_chunks = 0
 
             while True:
-                points, next_offset = qdrant.scroll(
+                points, next_offset = await qdrant.scroll(
                     collection_name=settings.COLLECTION_NAME,
                     limit=100,
                     offset=offset,
@@ -1050,7 +1204,7 @@ async def get_statistics(
 @app.get("/indexed-documents")
 async def list_indexed_documents(
     space_id: str,
-    qdrant: QdrantClient = Depends(get_qdrant_client),
+    qdrant: AsyncQdrantClient = Depends(get_qdrant_client),
 ):
     """List all indexed documents for a given space, with chunk counts."""
     logger.info(f"Listing indexed documents for space_id={space_id}")
@@ -1063,7 +1217,7 @@ async def list_indexed_documents(
         offset = None
 
         while True:
-            points, next_offset = qdrant.scroll(
+            points, next_offset = await qdrant.scroll(
                 collection_name=settings.COLLECTION_NAME,
                 limit=100,
                 offset=offset,
@@ -1196,7 +1350,8 @@ async def delete_space(slug: str):
 @app.post("/spaces/{slug}/wipe")
 async def wipe_space(
     slug: str,
-    qdrant: QdrantClient = Depends(get_qdrant_client),
+    qdrant: AsyncQdrantClient = Depends(get_qdrant_client),
+    cache: IndexedDocIdsCache = Depends(get_indexed_ids_cache),
 ):
     """Delete all indexed chunks belonging to a space from Qdrant.
 
@@ -1216,7 +1371,7 @@ async def wipe_space(
         must=[FieldCondition(key="space_ids", match=MatchAny(any=[slug]))]
     )
     while True:
-        points, next_offset = qdrant.scroll(
+        points, next_offset = await qdrant.scroll(
             collection_name=settings.COLLECTION_NAME,
             limit=100,
             offset=offset,
@@ -1230,10 +1385,12 @@ async def wipe_space(
         offset = next_offset
 
     # Delete all matching points
-    qdrant.delete(
+    await qdrant.delete(
         collection_name=settings.COLLECTION_NAME,
         points_selector=scroll_filter,
     )
+    cache.clear()
+    invalidate_retrieval_cache()
 
     logger.warning(f"Wiped space '{slug}': deleted {count_before} chunks from Qdrant")
     return {
@@ -1267,16 +1424,25 @@ async def cors_debug():
     """Debug endpoint to check CORS configuration."""
     return {
         "allowed_origins": settings.ALLOWED_ORIGINS,
-        "allowed_origins_type": type(settings.ALLOWED_ORIGINS).__name__
+        "allowed_origins_type": type(settings.ALLOWED_ORIGINS).__name__,
+        "effective_origins": list(get_cors_origins()),
     }
 
 
 if __name__ == "__main__":
     import uvicorn
+    # C event loop and HTTP parser from uvicorn[standard]; uvloop has no Windows build
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
     uvicorn.run(
         "app.main:app",
         host=settings.SERVER_HOST,
         port=settings.SERVER_PORT,
         log_level=settings.LOG_LEVEL.lower(),
+        loop=loop,
+        http="httptools",
         reload=False
     )
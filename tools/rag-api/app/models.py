@@ -18,6 +18,10 @@ class AskRequest(BaseModel):
         default=True,
         description="If true, allow a general (non-RAG) answer when no relevant documents are found"
     )
+    stream: bool = Field(
+        default=False,
+        description="If true, stream the answer as Server-Sent Events instead of one JSON response"
+    )
 
 
 class Citation(BaseModel):
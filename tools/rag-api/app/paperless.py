@@ -1,112 +1,273 @@
 """Integration with paperless-ngx API."""
 
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+import math
+import random
+from types import MappingProxyType
+from typing import AsyncIterator, Dict, List, Optional, Any
 import httpx
+import orjson
 from .config import get_settings
+from .spaces_config import get_valid_slugs
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+except ImportError:
+    h2 = None
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-# HTTP headers for paperless API authentication
-HEADERS = {"Authorization": f"Token {settings.PAPERLESS_API_TOKEN}"}
+# HTTP headers for paperless API authentication (read-only, shared by the client)
+HEADERS = MappingProxyType({"Authorization": f"Token {settings.PAPERLESS_API_TOKEN}"})
+
+# Endpoint URLs, built once. API paths are relative to the shared client's base_url.
+_BASE = settings.PAPERLESS_BASE_URL.rstrip("/")
+_DOCS_URL = "/api/documents/"
+_CUSTOM_FIELDS_URL = "/api/custom_fields/"
+_UI_DOCS_URL = f"{_BASE}/documents/"
+
+
+def _doc_url(doc_id: int, action: str = "") -> str:
+    """API URL of one document, optionally of a sub-resource such as "download/"."""
+    return f"{_DOCS_URL}{doc_id}/{action}"
+
+# Shared client so keep-alive connections to Paperless are reused across calls
+_client: Optional[httpx.AsyncClient] = None
+
+
+async def get_client() -> httpx.AsyncClient:
+    """Get the shared paperless-ngx HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=_BASE,
+            headers=HEADERS,
+            timeout=60,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=settings.PAPERLESS_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.PAPERLESS_MAX_KEEPALIVE,
+                keepalive_expiry=30.0,
+            ),
+            # Multiplex concurrent requests over one connection when Paperless speaks HTTP/2
+            http2=h2 is not None,
+        )
+    return _client
+
+
+async def close_client():
+    """Close the shared client (called on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# Transient failures worth retrying: rate limiting and gateway/availability errors
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+MAX_ATTEMPTS = 5
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff capped at 30s, with jitter so parallel requests don't retry in lockstep."""
+    return min(2 ** attempt, 30) + random.random()
+
+
+def _retry_after(response: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before retrying: Retry-After if given in seconds, else exponential backoff."""
+    try:
+        return min(float(response.headers["Retry-After"]), 60.0)
+    except (KeyError, ValueError):
+        return _backoff(attempt)
+
+
+async def _req(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    stream: bool = False,
+    attempts: int = MAX_ATTEMPTS,
+    **kwargs
+) -> httpx.Response:
+    """
+    Send a request, retrying transport errors and 429/502/503/504 responses.
+    
+    Args:
+        client: Client to send with
+        method: HTTP method
+        url: URL, relative to the client's base_url
+        stream: Return without reading the body (caller must close the response)
+        attempts: Total number of tries
+        **kwargs: Passed to build_request(); follow_redirects is passed to send()
+    
+    Returns:
+        The final response - which may still carry a retryable status once
+        attempts run out, so callers keep their raise_for_status()
+    """
+    follow_redirects = kwargs.pop("follow_redirects", httpx.USE_CLIENT_DEFAULT)
+    request = client.build_request(method, url, **kwargs)
+    
+    for attempt in range(attempts):
+        last = attempt == attempts - 1
+        try:
+            response = await client.send(request, stream=stream, follow_redirects=follow_redirects)
+        except httpx.TransportError as e:
+            if last:
+                raise
+            delay = _backoff(attempt)
+            logger.warning(f"Paperless {method} {url} failed ({e!r}), retrying in {delay:.1f}s")
+        else:
+            if response.status_code not in RETRY_STATUSES or last:
+                return response
+            delay = _retry_after(response, attempt)
+            await response.aclose()
+            logger.warning(f"Paperless {method} {url} returned {response.status_code}, retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
 
 
 async def list_documents(
     updated_after: Optional[str] = None,
     page_size: int = 100,
-    ordering: str = "-created"
+    ordering: str = "-created",
+    page: int = 1,
+    title_contains: Optional[str] = None
 ) -> Dict[str, Any]:
     """
-    List documents from paperless-ngx.
+    List one page of documents from paperless-ngx.
     
     Args:
         updated_after: ISO datetime string to filter documents modified after this time
         page_size: Number of documents per page
         ordering: Field to order by (e.g., "-created" for newest first)
+        page: 1-based page number
+        title_contains: Case-insensitive substring the title must contain
     
     Returns:
         Dictionary containing documents list and pagination info
     """
     params = {
         "ordering": ordering,
-        "page_size": page_size
+        "page_size": page_size,
+        "page": page
     }
     
     if updated_after:
         params["modified__gt"] = updated_after
+    if title_contains:
+        params["title__icontains"] = title_contains
     
-    async with httpx.AsyncClient(timeout=60) as client:
-        try:
-            response = await client.get(
-                f"{settings.PAPERLESS_BASE_URL}/api/documents/",
-                params=params,
-                headers=HEADERS
-            )
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPError as e:
-            logger.error(f"Failed to list documents: {e}")
-            raise
-
-
-async def list_all_documents(
-    updated_after: Optional[str] = None,
-    ordering: str = "-created"
+    client = await get_client()
+    try:
+        response = await _req(
+            client, "GET", _DOCS_URL,
+            params=params
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to list documents: {e}")
+        raise
+
+
+async def _fetch_all_pages(
+    params: Dict[str, Any],
+    page_size: int,
+    concurrency: int
 ) -> List[Dict[str, Any]]:
     """
-    List ALL documents from paperless-ngx, handling pagination automatically.
+    Fetch every page of /api/documents/ for the given filter params.
+    
+    Page 1 tells us the total count; the remaining pages are then requested
+    in parallel, at most `concurrency` at a time, and concatenated in page order.
     
     Args:
-        updated_after: ISO datetime string to filter documents modified after this time
-        ordering: Field to order by (e.g., "-created" for newest first)
+        params: Query params (ordering, filters) shared by every page
+        page_size: Number of documents per page (Paperless may cap this)
+        concurrency: Maximum number of page requests in flight
     
     Returns:
         List of all document dictionaries
     """
-    all_documents = []
-    page = 1
-    page_size = 100
-    
-    async with httpx.AsyncClient(timeout=60) as client:
-        while True:
-            params = {
-                "ordering": ordering,
-                "page_size": page_size,
-                "page": page
-            }
-            
-            if updated_after:
-                params["modified__gt"] = updated_after
-            
+    client = await get_client()
+    sem = asyncio.Semaphore(concurrency)
+
+    async def fetch_page(page: int) -> Dict[str, Any]:
+        async with sem:
             try:
-                response = await client.get(
-                    f"{settings.PAPERLESS_BASE_URL}/api/documents/",
-                    params=params,
-                    headers=HEADERS
+                response = await _req(
+                    client, "GET", _DOCS_URL,
+                    params={**params, "page_size": page_size, "page": page}
                 )
                 response.raise_for_status()
-                data = response.json()
-                
-                results = data.get("results", [])
-                all_documents.extend(results)
-                
-                logger.info(f"Fetched page {page}: {len(results)} documents (total so far: {len(all_documents)})")
-                
-                # Check if there are more pages
-                if not data.get("next"):
-                    break
-                
-                page += 1
-                
+                return orjson.loads(response.content)
             except httpx.HTTPError as e:
                 logger.error(f"Failed to list documents page {page}: {e}")
                 raise
     
+    first = await fetch_page(1)
+    all_documents = list(first.get("results", []))
+    
+    if first.get("next"):
+        # Size pages by what Paperless actually returned, in case it capped page_size
+        per_page = len(all_documents) or page_size
+        n_pages = math.ceil(first.get("count", 0) / per_page)
+        pages = await asyncio.gather(*[fetch_page(page) for page in range(2, n_pages + 1)])
+        for data in pages:
+            all_documents.extend(data.get("results", []))
+    
     logger.info(f"Fetched all {len(all_documents)} documents from Paperless")
     return all_documents
 
 
+async def list_all_documents(
+    updated_after: Optional[str] = None,
+    ordering: str = "-created,id"
+) -> List[Dict[str, Any]]:
+    """
+    List ALL documents from paperless-ngx, handling pagination automatically.
+    
+    Pages are fetched concurrently, so the ordering must be unique: `created`
+    is only a date, and ties ordered differently per page query would
+    duplicate or skip documents. The ID breaks those ties.
+    
+    Args:
+        updated_after: ISO datetime string to filter documents modified after this time
+        ordering: Fields to order by (e.g., "-created,id" for newest first); should be unique
+    
+    Returns:
+        List of all document dictionaries
+    """
+    params = {"ordering": ordering}
+    if updated_after:
+        params["modified__gt"] = updated_after
+    
+    return await _fetch_all_pages(params, page_size=100, concurrency=settings.PAPERLESS_PAGE_CONCURRENCY)
+
+
+async def list_all_paged(
+    page_size: int = 500,
+    concurrency: int = 8,
+    ordering: str = "id"
+) -> List[Dict[str, Any]]:
+    """
+    List ALL documents from paperless-ngx, fetching pages concurrently.
+    
+    The default ordering is by ID so page boundaries stay stable while the
+    pages are fetched.
+    
+    Args:
+        page_size: Number of documents per page (Paperless may cap this)
+        concurrency: Maximum number of page requests in flight
+        ordering: Field to order by; should be unique to keep pages disjoint
+    
+    Returns:
+        List of all document dictionaries, in `ordering` order
+    """
+    return await _fetch_all_pages({"ordering": ordering}, page_size, concurrency)
+
+
 async def get_document(doc_id: int) -> Dict[str, Any]:
     """
     Get detailed information about a specific document.
@@ -117,17 +278,91 @@ async def get_document(doc_id: int) -> Dict[str, Any]:
     Returns:
         Document metadata dictionary
     """
-    async with httpx.AsyncClient(timeout=60) as client:
+    client = await get_client()
+    try:
+        response = await _req(
+            client, "GET", _doc_url(doc_id)
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to get document {doc_id}: {e}")
+        raise
+
+
+# Documents requested per id__in page in get_documents()
+BULK_BATCH_SIZE = 100
+
+
+async def get_documents(doc_ids: List[int], concurrency: int = 5) -> List[Dict[str, Any]]:
+    """
+    Get metadata for several documents with a few id__in list requests.
+    
+    The list endpoint returns the same fields as the detail endpoint, so this
+    replaces one get_document() round-trip per document. Batches are fetched
+    concurrently.
+    
+    Args:
+        doc_ids: Paperless document IDs
+        concurrency: Maximum number of batch requests in flight
+    
+    Returns:
+        Document metadata dictionaries, in doc_ids order; IDs Paperless doesn't know are omitted
+    """
+    client = await get_client()
+    sem = asyncio.Semaphore(concurrency)
+    
+    async def fetch_batch(batch: List[int]) -> List[Dict[str, Any]]:
+        async with sem:
+            try:
+                response = await _req(
+                    client, "GET", _DOCS_URL,
+                    params={"id__in": ",".join(map(str, batch)), "page_size": len(batch)}
+                )
+                response.raise_for_status()
+                return orjson.loads(response.content).get("results", [])
+            except httpx.HTTPError as e:
+                logger.error(f"Failed to get documents {batch[0]}..{batch[-1]}: {e}")
+                raise
+    
+    batches = [doc_ids[i:i + BULK_BATCH_SIZE] for i in range(0, len(doc_ids), BULK_BATCH_SIZE)]
+    results = await asyncio.gather(*[fetch_batch(batch) for batch in batches])
+    
+    docs_by_id = {doc["id"]: doc for batch in results for doc in batch}
+    return [docs_by_id[doc_id] for doc_id in doc_ids if doc_id in docs_by_id]
+
+
+# Read size for streamed downloads
+STREAM_CHUNK_SIZE = 65536
+
+
+async def _stream_file(doc_id: int, kind: str) -> AsyncIterator[bytes]:
+    """Yield a document's `download` or `preview` file in chunks as they arrive."""
+    client = await get_client()
+    try:
+        response = await _req(client, "GET", _doc_url(doc_id, f"{kind}/"), stream=True, timeout=120)
         try:
-            response = await client.get(
-                f"{settings.PAPERLESS_BASE_URL}/api/documents/{doc_id}/",
-                headers=HEADERS
-            )
             response.raise_for_status()
-            return response.json()
-        except httpx.HTTPError as e:
-            logger.error(f"Failed to get document {doc_id}: {e}")
-            raise
+            async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                yield chunk
+        finally:
+            await response.aclose()
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to {kind} document {doc_id}: {e}")
+        raise
+
+
+def stream_document(doc_id: int) -> AsyncIterator[bytes]:
+    """
+    Stream the original document file without buffering it in memory.
+    
+    Args:
+        doc_id: Paperless document ID
+    
+    Returns:
+        Async iterator over the file content, in chunks of up to STREAM_CHUNK_SIZE bytes
+    """
+    return _stream_file(doc_id, "download")
 
 
 async def download_document(doc_id: int) -> bytes:
@@ -140,17 +375,34 @@ async def download_document(doc_id: int) -> bytes:
     Returns:
         Document file content as bytes
     """
-    async with httpx.AsyncClient(timeout=120) as client:
-        try:
-            response = await client.get(
-                f"{settings.PAPERLESS_BASE_URL}/api/documents/{doc_id}/download/",
-                headers=HEADERS
-            )
-            response.raise_for_status()
-            return response.content
-        except httpx.HTTPError as e:
-            logger.error(f"Failed to download document {doc_id}: {e}")
-            raise
+    return b"".join([chunk async for chunk in stream_document(doc_id)])
+
+
+async def download_documents(doc_ids: List[int], concurrency: int = 10) -> List[bytes]:
+    """
+    Download several original document files concurrently.
+    
+    Args:
+        doc_ids: Paperless document IDs
+        concurrency: Maximum number of downloads in flight
+    
+    Returns:
+        File contents as bytes, in the same order as doc_ids
+    
+    Raises:
+        ExceptionGroup: If any download fails (the remaining ones are cancelled)
+    """
+    sem = asyncio.Semaphore(concurrency)
+    
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(_guarded_download(doc_id, sem)) for doc_id in doc_ids]
+    
+    return [task.result() for task in tasks]
+
+
+async def _guarded_download(doc_id: int, sem: asyncio.Semaphore) -> bytes:
+    async with sem:
+        return await download_document(doc_id)
 
 
 async def get_document_preview(doc_id: int) -> bytes:
@@ -163,17 +415,7 @@ async def get_document_preview(doc_id: int) -> bytes:
     Returns:
         Preview file content as bytes
     """
-    async with httpx.AsyncClient(timeout=120) as client:
-        try:
-            response = await client.get(
-                f"{settings.PAPERLESS_BASE_URL}/api/documents/{doc_id}/preview/",
-                headers=HEADERS
-            )
-            response.raise_for_status()
-            return response.content
-        except httpx.HTTPError as e:
-            logger.error(f"Failed to get preview for document {doc_id}: {e}")
-            raise
+    return b"".join([chunk async for chunk in _stream_file(doc_id, "preview")])
 
 
 async def get_document_text(doc_id: int) -> str:
@@ -186,21 +428,21 @@ async def get_document_text(doc_id: int) -> str:
     Returns:
         Extracted text content
     """
-    async with httpx.AsyncClient(timeout=60) as client:
-        try:
-            response = await client.get(
-                f"{settings.PAPERLESS_BASE_URL}/api/documents/{doc_id}/download/",
-                headers={**HEADERS, "Accept": "text/plain"}
-            )
-            if response.status_code == 200:
-                return response.text
-            else:
-                # Fallback to downloading and extracting
-                logger.warning(f"Text endpoint not available for document {doc_id}, using file download")
-                return ""
-        except httpx.HTTPError as e:
-            logger.error(f"Failed to get text for document {doc_id}: {e}")
+    client = await get_client()
+    try:
+        response = await _req(
+            client, "GET", _doc_url(doc_id, "download/"),
+            headers={"Accept": "text/plain"}
+        )
+        if response.status_code == 200:
+            return response.text
+        else:
+            # Fallback to downloading and extracting
+            logger.warning(f"Text endpoint not available for document {doc_id}, using file download")
             return ""
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to get text for document {doc_id}: {e}")
+        return ""
 
 
 def build_document_url(doc_id: int) -> str:
@@ -213,7 +455,7 @@ def build_document_url(doc_id: int) -> str:
     Returns:
         URL string to view the document
     """
-    return f"{settings.PAPERLESS_BASE_URL}/documents/{doc_id}"
+    return f"{_UI_DOCS_URL}{doc_id}"
 
 
 async def test_connection() -> bool:
@@ -223,76 +465,88 @@ async def test_connection() -> bool:
     Returns:
         True if connection is successful, False otherwise
     """
-    async with httpx.AsyncClient(timeout=30, follow_redirects=True) as client:
-        try:
-            # Try the documents endpoint instead of base API
-            response = await client.get(
-                f"{settings.PAPERLESS_BASE_URL}/api/documents/",
-                headers=HEADERS,
-                params={"page_size": 1}
-            )
-            response.raise_for_status()
-            logger.info("Successfully connected to paperless-ngx")
-            return True
-        except httpx.HTTPError as e:
-            logger.error(f"Failed to connect to paperless-ngx: {e}")
-            # Try alternative endpoint
-            try:
-                response = await client.get(
-                    f"{settings.PAPERLESS_BASE_URL}/api/",
-                    headers=HEADERS
-                )
-                if response.status_code == 200:
-                    logger.info("Connected to paperless-ngx (via base API)")
-                    return True
-            except:
-                pass
-            return False
+    client = await get_client()
+    try:
+        # HEAD skips the body transfer; page_size=1 keeps Paperless from assembling a large page
+        response = await _req(
+            client, "HEAD", _DOCS_URL,
+            params={"page_size": 1},
+            timeout=30,
+            # A connectivity probe should answer promptly rather than back off
+            attempts=1
+        )
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to connect to paperless-ngx: {e}")
+        return False
+
+    if not response.is_success:
+        # 401/403 means Paperless is up but the token is wrong - still not usable
+        logger.error(f"Failed to connect to paperless-ngx: HTTP {response.status_code}")
+        return False
+
+    logger.info("Successfully connected to paperless-ngx")
+    return True
 
 
 # --- Space helpers ---
 
 # Cached custom field ID for the "RAG Spaces" field (resolved once)
 _space_field_id: Optional[int] = None
-_space_field_resolved: bool = False
+# In-flight or finished lookup, shared so concurrent callers make a single request
+_space_field_future: Optional[asyncio.Future] = None
 
 
 async def get_space_field_id() -> Optional[int]:
     """Resolve the Paperless custom field ID for the RAG Spaces field.
 
-    Calls GET /api/custom_fields/ once and caches the result.
-    Returns None if the field doesn't exist.
+    Calls GET /api/custom_fields/ once and caches the result; concurrent
+    callers wait on the same request. A failed request is retried on the
+    next call. Returns None if the field doesn't exist.
     """
-    global _space_field_id, _space_field_resolved
+    global _space_field_future
 
-    if _space_field_resolved:
-        return _space_field_id
+    if _space_field_future is None:
+        _space_field_future = asyncio.ensure_future(_fetch_space_field_id())
+    future = _space_field_future
 
-    field_name = settings.SPACE_CUSTOM_FIELD_NAME
-    async with httpx.AsyncClient(timeout=30) as client:
-        try:
-            response = await client.get(
-                f"{settings.PAPERLESS_BASE_URL}/api/custom_fields/",
-                headers=HEADERS,
-                params={"page_size": 200},
-            )
-            response.raise_for_status()
-            data = response.json()
-            results = data.get("results", data) if isinstance(data, dict) else data
+    try:
+        # Shield so a cancelled caller doesn't cancel the lookup others are waiting on
+        return await asyncio.shield(future)
+    except Exception:
+        # Don't cache unexpected failures either
+        if _space_field_future is future:
+            _space_field_future = None
+        raise
 
-            for field in results:
-                if field.get("name") == field_name:
-                    _space_field_id = field["id"]
-                    _space_field_resolved = True
-                    logger.info(f"Resolved '{field_name}' custom field → ID {_space_field_id}")
-                    return _space_field_id
 
-            logger.warning(f"Custom field '{field_name}' not found in Paperless")
-            _space_field_resolved = True
-            return None
-        except httpx.HTTPError as e:
-            logger.error(f"Failed to fetch custom fields: {e}")
-            return None
+async def _fetch_space_field_id() -> Optional[int]:
+    global _space_field_id, _space_field_future
+
+    field_name = settings.SPACE_CUSTOM_FIELD_NAME
+    client = await get_client()
+    try:
+        response = await _req(
+            client, "GET", _CUSTOM_FIELDS_URL,
+            # Let Paperless filter by name; the exact match below still applies if it doesn't
+            params={"page_size": 200, "name__iexact": field_name},
+            timeout=30,
+        )
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        results = data.get("results", data) if isinstance(data, dict) else data
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to fetch custom fields: {e}")
+        # Forget the failed lookup so the next call tries again
+        _space_field_future = None
+        return None
+
+    field_ids = {field.get("name"): field["id"] for field in results}
+    _space_field_id = field_ids.get(field_name)
+    if _space_field_id is None:
+        logger.warning(f"Custom field '{field_name}' not found in Paperless")
+    else:
+        logger.info(f"Resolved '{field_name}' custom field → ID {_space_field_id}")
+    return _space_field_id
 
 
 def get_document_spaces(doc_metadata: dict) -> List[str]:
@@ -302,23 +556,22 @@ def get_document_spaces(doc_metadata: dict) -> List[str]:
     strips/lowercases, and filters against defined spaces.
     Returns [] if the field is missing, empty, or no valid slugs found.
     """
-    from .spaces_config import is_valid_space
-
-    if _space_field_id is None:
+    field_id = _space_field_id
+    if field_id is None:
         return []
 
-    custom_fields = doc_metadata.get("custom_fields", [])
-    for entry in custom_fields:
-        if entry.get("field") == _space_field_id:
+    for entry in doc_metadata.get("custom_fields", []):
+        if entry["field"] == field_id:
             raw_value = entry.get("value")
             if not raw_value or not isinstance(raw_value, str):
                 return []
 
-            slugs = [s.strip().lower() for s in raw_value.split(",") if s.strip()]
-            valid = [s for s in slugs if is_valid_space(s)]
+            slugs = [s for s in (x.strip().lower() for x in raw_value.split(",")) if s]
+            valid_set = get_valid_slugs()
+            valid = [s for s in slugs if s in valid_set]
 
-            invalid = set(slugs) - set(valid)
-            if invalid:
+            if len(valid) != len(slugs):
+                invalid = set(slugs) - valid_set
                 doc_id = doc_metadata.get("id", "?")
                 logger.warning(f"Document {doc_id}: ignoring unknown space slugs: {invalid}")
 
@@ -337,19 +590,18 @@ async def get_document_by_title(title: str) -> Optional[Dict[str, Any]]:
     Returns:
         Document metadata if found, None otherwise
     """
-    async with httpx.AsyncClient(timeout=60) as client:
-        try:
-            response = await client.get(
-                f"{settings.PAPERLESS_BASE_URL}/api/documents/",
-                params={"title__icontains": title},
-                headers=HEADERS
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("results"):
-                return data["results"][0]
-            return None
-        except httpx.HTTPError as e:
-            logger.error(f"Failed to search for document with title '{title}': {e}")
-            return None
+    client = await get_client()
+    try:
+        response = await _req(
+            client, "GET", _DOCS_URL,
+            params={"title__icontains": title}
+        )
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        
+        if data.get("results"):
+            return data["results"][0]
+        return None
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to search for document with title '{title}': {e}")
+        return None
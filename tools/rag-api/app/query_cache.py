@@ -0,0 +1,56 @@
+"""Content-addressed caches for query embeddings and retrieval results."""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from .config import get_settings
+
+settings = get_settings()
+
+
+class TTLCache:
+    """Small LRU cache whose entries also expire `ttl` seconds after being stored."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+
+def query_hash(query: str) -> str:
+    """Content address of a query string."""
+    return hashlib.blake2b(query.encode(), digest_size=16).hexdigest()
+
+
+# Query embeddings are deterministic for a given model, so they only age out by TTL/LRU
+EMBED_CACHE = TTLCache(settings.QUERY_CACHE_SIZE, settings.QUERY_CACHE_TTL)
+
+# Search results depend on the collection contents - cleared whenever vectors are written or deleted
+RETRIEVAL_CACHE = TTLCache(settings.QUERY_CACHE_SIZE, settings.QUERY_CACHE_TTL)
+
+
+def invalidate_retrieval_cache():
+    """Forget cached search results after the collection changed."""
+    RETRIEVAL_CACHE.clear()
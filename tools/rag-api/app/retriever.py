@@ -1,12 +1,14 @@
 """Vector search and retrieval functionality."""
 
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional, Tuple
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.http.models import Filter, FieldCondition, MatchAny
 from sentence_transformers import SentenceTransformer
 
 from .config import get_settings
+from .query_cache import EMBED_CACHE, RETRIEVAL_CACHE, query_hash
 from .spaces_config import get_space_params
 
 logger = logging.getLogger(__name__)
@@ -15,8 +17,8 @@ settings = get_settings()
 COLLECTION_NAME = "paperless_chunks"
 
 
-def search_similar_chunks(
-    qdrant_client: QdrantClient,
+async def search_similar_chunks(
+    qdrant_client: AsyncQdrantClient,
     embedding_model: SentenceTransformer,
     query: str,
     top_k: int = None,
@@ -46,12 +48,23 @@ def search_similar_chunks(
     if score_threshold is None:
         score_threshold = space_params.score_threshold
 
+    # Repeated questions skip the search, and repeated wording skips the embedding.
+    # Callers mutate the returned dicts (scores), so the cache hands out copies.
+    key = query_hash(query)
+    retrieval_key = (key, top_k, tuple(sorted(filter_tags or ())), space_id, score_threshold)
+    cached = RETRIEVAL_CACHE.get(retrieval_key)
+    if cached is not None:
+        return [dict(chunk) for chunk in cached]
+
     try:
-        # Generate query embedding
-        query_vector = embedding_model.encode([query], convert_to_tensor=False)
-        if hasattr(query_vector, 'tolist'):
-            query_vector = query_vector.tolist()
-        query_vector = query_vector[0]  # Get the first (and only) embedding
+        query_vector = EMBED_CACHE.get(key)
+        if query_vector is None:
+            # Generate query embedding (blocking model call, so run it in a thread)
+            query_vector = await asyncio.to_thread(embedding_model.encode, [query], convert_to_tensor=False)
+            if hasattr(query_vector, 'tolist'):
+                query_vector = query_vector.tolist()
+            query_vector = query_vector[0]  # Get the first (and only) embedding
+            EMBED_CACHE.set(key, query_vector)
 
         # Build search filter conditions
         filter_conditions = []
@@ -67,7 +80,7 @@ def search_similar_chunks(
         search_filter = Filter(must=filter_conditions) if filter_conditions else None
 
         # Perform vector search (qdrant-client >= 1.14 uses query_points)
-        search_response = qdrant_client.query_points(
+        search_response = await qdrant_client.query_points(
             collection_name=COLLECTION_NAME,
             query=query_vector,
             query_filter=search_filter,
@@ -110,6 +123,7 @@ def search_similar_chunks(
                 it["score"] += boost
         
         formatted_results.sort(key=lambda x: x["score"], reverse=True)
+        RETRIEVAL_CACHE.set(retrieval_key, [dict(chunk) for chunk in formatted_results])
         logger.info(f"Found {len(formatted_results)} similar chunks for query (with project grouping boost)")
         return formatted_results
         
@@ -118,8 +132,8 @@ def search_similar_chunks(
         raise
 
 
-def search_by_document_id(
-    qdrant_client: QdrantClient,
+async def search_by_document_id(
+    qdrant_client: AsyncQdrantClient,
     doc_id: int,
     limit: int = 100
 ) -> List[Dict[str, Any]]:
@@ -140,7 +154,7 @@ def search_by_document_id(
         )
         
         # Use scroll for better performance with large results
-        chunks, _ = qdrant_client.scroll(
+        chunks, _ = await qdrant_client.scroll(
             collection_name=COLLECTION_NAME,
             scroll_filter=search_filter,
             limit=limit
@@ -166,8 +180,8 @@ def search_by_document_id(
         raise
 
 
-def hybrid_search(
-    qdrant_client: QdrantClient,
+async def hybrid_search(
+    qdrant_client: AsyncQdrantClient,
     embedding_model: SentenceTransformer,
     query: str,
     top_k: int = None,
@@ -192,7 +206,7 @@ def hybrid_search(
         top_k = settings.RAG_TOP_K
     
     # Get vector search results
-    vector_results = search_similar_chunks(
+    vector_results = await search_similar_chunks(
         qdrant_client=qdrant_client,
         embedding_model=embedding_model,
         query=query,
@@ -223,8 +237,8 @@ def hybrid_search(
     return vector_results[:top_k]
 
 
-def get_chunks_summary(
-    qdrant_client: QdrantClient,
+async def get_chunks_summary(
+    qdrant_client: AsyncQdrantClient,
     doc_ids: Optional[List[int]] = None
 ) -> Dict[str, Any]:
     """
@@ -250,7 +264,7 @@ def get_chunks_summary(
         offset = None
         
         while True:
-            chunks, next_offset = qdrant_client.scroll(
+            chunks, next_offset = await qdrant_client.scroll(
                 collection_name=COLLECTION_NAME,
                 scroll_filter=search_filter,
                 limit=1000,
@@ -1,12 +1,18 @@
 """Load and manage per-space RAG configuration from spaces.yaml."""
 
+import copy
 import logging
 import os
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
 import yaml
 
+try:
+    from yaml import CSafeDumper as _Dumper, CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeDumper as _Dumper, SafeLoader as _Loader
+
 from .config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -25,7 +31,7 @@ _FALLBACK_DEFAULTS = {
 }
 
 
-@dataclass
+@dataclass(frozen=True)
 class SpaceParams:
     """Per-space RAG tuning parameters."""
     chunk_tokens: int
@@ -34,58 +40,120 @@ class SpaceParams:
     score_threshold: float
 
 
-def load_spaces_config() -> dict:
-    """Load spaces config from YAML file. Re-reads on every call (no caching)."""
-    if not os.path.exists(_SPACES_CONFIG_PATH):
+# Parsed config and its valid slugs, keyed by the file's (mtime_ns, size);
+# re-parsed only when the file changes
+_cached_config: Optional[Tuple[Tuple[int, int], dict, FrozenSet[str]]] = None
+
+_EMPTY_SLUGS: FrozenSet[str] = frozenset()
+
+# Bumped whenever _get_cached() hands out a different config than last time
+_config_version = 0
+
+# get_space_params() results for the current _config_version, keyed by defined slug (None = defaults)
+_params_cache: Dict[Optional[str], SpaceParams] = {}
+_params_cache_version = -1
+
+
+def _fallback() -> Tuple[dict, FrozenSet[str]]:
+    global _cached_config, _config_version
+    _cached_config = None
+    _config_version += 1
+    return {"defaults": _FALLBACK_DEFAULTS, "spaces": {}}, _EMPTY_SLUGS
+
+
+def _get_cached() -> Tuple[dict, FrozenSet[str]]:
+    """Return the parsed spaces config and its slug set, shared between callers - do not mutate."""
+    global _cached_config, _config_version
+
+    try:
+        st = os.stat(_SPACES_CONFIG_PATH)
+    except FileNotFoundError:
         logger.warning(f"Spaces config not found at {_SPACES_CONFIG_PATH}, using defaults")
-        return {"defaults": _FALLBACK_DEFAULTS, "spaces": {}}
+        return _fallback()
+
+    key = (st.st_mtime_ns, st.st_size)
+    if _cached_config is not None and _cached_config[0] == key:
+        return _cached_config[1], _cached_config[2]
 
     try:
-        with open(_SPACES_CONFIG_PATH, "r") as f:
-            data = yaml.safe_load(f) or {}
+        # One read of the raw bytes; libyaml decodes them itself
+        with open(_SPACES_CONFIG_PATH, "rb") as f:
+            data = yaml.load(f.read(), Loader=_Loader) or {}
     except Exception as e:
         logger.error(f"Failed to read spaces config: {e}")
-        return {"defaults": _FALLBACK_DEFAULTS, "spaces": {}}
+        return _fallback()
 
     defaults = {**_FALLBACK_DEFAULTS, **(data.get("defaults") or {})}
     spaces = data.get("spaces") or {}
-    return {"defaults": defaults, "spaces": spaces}
+    config = {"defaults": defaults, "spaces": spaces}
+    slugs = frozenset(spaces.keys())
+    _cached_config = (key, config, slugs)
+    _config_version += 1
+    return config, slugs
+
+
+def _get_config() -> dict:
+    return _get_cached()[0]
+
+
+def get_valid_slugs() -> FrozenSet[str]:
+    """Return the set of defined space slugs."""
+    return _get_cached()[1]
+
+
+def load_spaces_config() -> dict:
+    """Load spaces config from YAML file.
+
+    Parsed once and re-read only when the file's mtime/size change. Returns a
+    copy, so callers may edit it before passing it to save_spaces_config().
+    """
+    return copy.deepcopy(_get_config())
 
 
 def save_spaces_config(spaces: dict, defaults: Optional[dict] = None) -> None:
     """Write the spaces config back to YAML, preserving the defaults section."""
-    current = load_spaces_config()
+    global _cached_config, _config_version
+    current = _get_config()
     data = {
         "defaults": defaults if defaults is not None else current["defaults"],
         "spaces": spaces,
     }
     os.makedirs(os.path.dirname(_SPACES_CONFIG_PATH), exist_ok=True)
-    with open(_SPACES_CONFIG_PATH, "w") as f:
-        yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+
+    # Write a sibling temp file and rename it over the config, so a crash
+    # mid-write can never leave a truncated spaces.yaml behind
+    tmp_path = _SPACES_CONFIG_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        yaml.dump(data, f, Dumper=_Dumper, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, _SPACES_CONFIG_PATH)
+
+    # Prime the cache with what was just written instead of re-parsing it on the next read
+    st = os.stat(_SPACES_CONFIG_PATH)
+    config = {
+        "defaults": {**_FALLBACK_DEFAULTS, **(data["defaults"] or {})},
+        "spaces": copy.deepcopy(spaces),
+    }
+    _cached_config = ((st.st_mtime_ns, st.st_size), config, frozenset(config["spaces"].keys()))
+    _config_version += 1
     logger.info(f"Saved spaces config with {len(spaces)} space(s)")
 
 
 def get_defined_spaces() -> List[str]:
     """Return list of all defined space slugs."""
-    config = load_spaces_config()
+    config = _get_config()
     return list(config["spaces"].keys())
 
 
 def is_valid_space(slug: str) -> bool:
     """Check if a slug is defined in the config."""
-    return slug in load_spaces_config()["spaces"]
+    return slug in get_valid_slugs()
 
 
-def get_space_params(space_id: Optional[str] = None) -> SpaceParams:
-    """Get RAG parameters for a space, merging defaults with any overrides.
-
-    If space_id is None or not defined, returns defaults.
-    """
-    config = load_spaces_config()
-    defaults = config["defaults"]
-
-    if space_id and space_id in config["spaces"]:
-        overrides = config["spaces"][space_id]
+def _merge_params(defaults: dict, overrides: Optional[dict] = None) -> SpaceParams:
+    """Apply a space's overrides (ignoring its display name) on top of the defaults."""
+    if overrides:
         merged = {**defaults, **{k: v for k, v in overrides.items() if k != "name"}}
     else:
         merged = defaults
@@ -98,17 +166,11 @@ def get_space_params(space_id: Optional[str] = None) -> SpaceParams:
     )
 
 
-def get_space_info(space_id: str) -> Optional[Dict]:
-    """Return info dict for a single space, or None if not defined."""
-    config = load_spaces_config()
-    space_data = config["spaces"].get(space_id)
-    if space_data is None:
-        return None
-
-    params = get_space_params(space_id)
+def _build_info(slug: str, space_data: dict, defaults: dict) -> Dict:
+    params = _merge_params(defaults, space_data)
     return {
-        "slug": space_id,
-        "name": space_data.get("name", space_id),
+        "slug": slug,
+        "name": space_data.get("name", slug),
         "params": {
             "chunk_tokens": params.chunk_tokens,
             "chunk_overlap": params.chunk_overlap,
@@ -118,12 +180,45 @@ def get_space_info(space_id: str) -> Optional[Dict]:
     }
 
 
+def get_space_params(space_id: Optional[str] = None, config: Optional[dict] = None) -> SpaceParams:
+    """Get RAG parameters for a space, merging defaults with any overrides.
+
+    If space_id is None or not defined, returns defaults. Pass `config` to
+    reuse an already-loaded config.
+    """
+    global _params_cache_version
+
+    if config is not None:
+        overrides = config["spaces"].get(space_id) if space_id else None
+        return _merge_params(config["defaults"], overrides)
+
+    config = _get_config()
+    if _params_cache_version != _config_version:
+        _params_cache.clear()
+        _params_cache_version = _config_version
+
+    # Undefined spaces share the defaults entry, so arbitrary request values can't grow the cache
+    key = space_id if space_id in config["spaces"] else None
+    params = _params_cache.get(key)
+    if params is None:
+        params = _merge_params(config["defaults"], config["spaces"].get(key) if key else None)
+        _params_cache[key] = params
+    return params
+
+
+def get_space_info(space_id: str, config: Optional[dict] = None) -> Optional[Dict]:
+    """Return info dict for a single space, or None if not defined."""
+    config = config or _get_config()
+    space_data = config["spaces"].get(space_id)
+    if space_data is None:
+        return None
+    return _build_info(space_id, space_data, config["defaults"])
+
+
 def get_all_spaces_info() -> List[Dict]:
     """Return info for all defined spaces."""
-    config = load_spaces_config()
-    result = []
-    for slug in config["spaces"]:
-        info = get_space_info(slug)
-        if info:
-            result.append(info)
-    return result
+    config = _get_config()
+    return [
+        _build_info(slug, space_data, config["defaults"])
+        for slug, space_data in config["spaces"].items()
+    ]